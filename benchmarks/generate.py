@@ -0,0 +1,168 @@
+''' Seeded generator for tblWholesalerMovement-shaped data in a local SQLite stand-in
+
+    Usage: python -m benchmarks.generate <rows> [--seed 0] [--path benchmarks/data/movement.sqlite]
+'''
+import os
+import zlib
+import sqlite3
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from packages.database import Database
+
+
+directory = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data')
+
+lastPeriod = pd.Timestamp('2024-04-30')
+periods: int = 61
+wholesalers: int = 8
+batch: int = 500000
+
+
+def getPath(rows: int, seed: int) -> str:
+    return os.path.join(directory, f'movement-{rows}-{seed}.sqlite')
+
+
+def getCardinality(rows: int) -> tuple:
+    stores = int(np.clip(rows // 400, 50, 25000))
+    upcs = int(np.clip(rows // 5000, 40, 1200))
+    pairs = min(stores * upcs, stores * 30)
+
+    return stores, upcs, pairs
+
+
+def generate(rows: int, *, seed: int = 0, path: str = None) -> str:
+    path = path or getPath(rows, seed)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    if os.path.exists(path):
+        os.remove(path)
+
+    rng = np.random.default_rng(seed)
+    stores, upcs, pairs = getCardinality(rows)
+
+    pairStore = rng.integers(0, stores, pairs)
+    pairUPC = rng.zipf(1.6, pairs) % upcs
+    pairWeight = rng.pareto(1.2, pairs) + 1
+    pairWeight /= pairWeight.sum()
+    pairMean = rng.lognormal(1.0, 0.8, pairs)
+
+    storeNumbers = np.array([f'{number:06d}' for number in rng.choice(999999, stores, replace=False)])
+    upcCodes = np.array([f'{code:012d}' for code in rng.choice(10 ** 12, upcs, replace=False)])
+    reportPeriods = np.array([
+        (lastPeriod - pd.offsets.MonthEnd(offset)).strftime('%Y-%m-%d %H:%M:%S')
+        for offset in range(periods)
+    ])
+
+    connection = sqlite3.connect(path)
+    connection.execute(f'''
+        CREATE TABLE tblWholesalerMovement ({', '.join(Database._structure())})
+    ''')
+
+    for start in range(0, rows, batch):
+        size = min(batch, rows - start)
+
+        pair = rng.choice(pairs, size, p=pairWeight)
+        store = pairStore[pair]
+
+        qty = rng.poisson(pairMean[pair])
+        qty[rng.random(size) < 0.01] *= -1
+
+        frame = pd.DataFrame({
+            'ID': np.arange(start, start + size),
+            'WholesalerID': store % wholesalers + 1,
+            'CustomerID': store,
+            'StoreNumber': storeNumbers[store],
+            'CustomerName': np.char.add('Store ', storeNumbers[store]),
+            'Address': '',
+            'City': '',
+            'State': '',
+            'Zipcode': '',
+            'Description': '',
+            'Qty': qty,
+            'UPC': upcCodes[pairUPC[pair]],
+            'UnitPrice': np.round(rng.uniform(0.5, 40, size), 2),
+            'LIC': '',
+            'ReportPeriod': reportPeriods[rng.integers(0, periods, size)]
+        })
+
+        frame.to_sql('tblWholesalerMovement', connection, if_exists='append', index=False)
+
+    connection.execute('CREATE INDEX ixReportPeriod ON tblWholesalerMovement (ReportPeriod)')
+    connection.commit()
+    connection.close()
+
+    return path
+
+
+def getStoreNumbers(path: str) -> list:
+    connection = sqlite3.connect(path)
+    stores = [row[0] for row in connection.execute('SELECT DISTINCT StoreNumber FROM tblWholesalerMovement')]
+    connection.close()
+
+    return stores
+
+
+class CountBig():
+    ''' Stand-in for SQL Server's COUNT_BIG(*) '''
+
+    def __init__(self):
+        self.count = 0
+
+    def step(self, *values):
+        self.count += 1
+
+    def finalize(self):
+        return self.count
+
+
+class ChecksumAgg():
+    ''' Stand-in for SQL Server's CHECKSUM_AGG, XOR-ing the row checksums '''
+
+    def __init__(self):
+        self.checksum = 0
+
+    def step(self, value):
+        self.checksum ^= value or 0
+
+    def finalize(self):
+        return self.checksum
+
+
+def checksum(*values) -> int:
+    ''' Stand-in for SQL Server's CHECKSUM over a row's values, as a signed 32-bit integer '''
+    value = zlib.crc32(repr(values).encode())
+
+    return value - 2 ** 32 if value >= 2 ** 31 else value
+
+
+def connect(path: str):
+    ''' Opens the SQLite file so that `dbo.tblWholesalerMovement` resolves as it does on SQL Server,
+        with stand-ins for the T-SQL functions the fingerprint queries use
+    '''
+
+    sqlite3.register_adapter(pd.Timestamp, lambda value: value.isoformat(' '))
+
+    def connector():
+        connection = sqlite3.connect(':memory:', check_same_thread=False)
+        connection.execute('ATTACH DATABASE ? AS dbo', (path,))
+
+        connection.create_aggregate('COUNT_BIG', -1, CountBig)
+        connection.create_aggregate('CHECKSUM_AGG', 1, ChecksumAgg)
+        connection.create_function('CHECKSUM', -1, checksum, deterministic=True)
+
+        return connection
+
+    return connector
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Generate synthetic movement data')
+    parser.add_argument('rows', type=int)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--path', default=None)
+    args = parser.parse_args()
+
+    print(generate(args.rows, seed=args.seed, path=args.path))
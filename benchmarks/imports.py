@@ -0,0 +1,68 @@
+''' Startup benchmark for importing the pipeline and printing --help
+
+    Usage: python -m benchmarks.imports [runs]
+'''
+import os
+import sys
+import time
+import statistics
+import subprocess
+
+
+root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+commands = {
+    'python (baseline)': [sys.executable, '-c', 'pass'],
+    'import main': [sys.executable, '-c', 'import main'],
+    'import packages.data': [sys.executable, '-c', 'import packages.data'],
+    'main.py --help': [sys.executable, 'main.py', '--help']
+}
+
+
+def measure(command: list, runs: int) -> list:
+    timings = []
+
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run(command, cwd=root, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=False)
+        timings.append(time.perf_counter() - start)
+
+    return timings
+
+
+def heaviest(module: str, count: int = 10) -> list:
+    ''' Slowest direct dependencies of an import, by cumulative time from -X importtime '''
+    output = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        cwd=root, capture_output=True, text=True
+    )
+
+    rows, children = [], []
+    for line in output.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+
+        _, cumulative, name = line[len('import time:'):].split('|')
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+
+        if depth == 1:
+            children.append((int(cumulative), name.strip()))
+        elif depth == 0:
+            rows = children if name.strip() == module else rows
+            children = []
+
+    return sorted(rows, reverse=True)[:count]
+
+
+def main(runs: int = 5) -> None:
+    for label, command in commands.items():
+        timings = measure(command, runs)
+        print(f'{label:<24} median {statistics.median(timings):>7.3f}s  best {min(timings):>7.3f}s')
+
+    print('\nHeaviest direct imports of main (cumulative):')
+    for cumulative, name in heaviest('main'):
+        print(f'  {cumulative / 1000:>8.1f} ms  {name}')
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 5)
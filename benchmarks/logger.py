@@ -0,0 +1,49 @@
+''' Micro-benchmark for CustomLogger throughput
+
+    Usage: python -m benchmarks.logger [messages]
+'''
+import os
+import sys
+import time
+import tempfile
+
+from packages.logger import CustomLogger as log
+
+
+def unbuffered(path: str, message: str) -> None:
+    with open(path, 'a+') as logfile:
+        logfile.write(message + '\n')
+
+
+def measure(label: str, calls: int, action) -> float:
+    start = time.perf_counter()
+
+    for i in range(calls):
+        action(i)
+
+    log.flush()
+    elapsed = time.perf_counter() - start
+
+    print(f'{label:<32} {elapsed:>8.3f}s  {calls / elapsed:>12,.0f} msg/s')
+
+    return elapsed
+
+
+def main(calls: int = 100000) -> None:
+    workspace = tempfile.mkdtemp()
+    log.logfiles = {key: os.path.join(workspace, key) for key in ['events', 'errors']}
+    log.threshold = len(log.levels)
+
+    measure('open-per-message (baseline)', calls, lambda i: unbuffered(log.logfiles['events'], f'message {i}'))
+
+    log.fileThreshold = 0
+    measure('trace -> queued file writer', calls, lambda i: log.trace(f'message {i}'))
+
+    log.fileThreshold = 1
+    measure('trace (level disabled)', calls, lambda i: log.trace(f'message {i}'))
+
+    log.close()
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
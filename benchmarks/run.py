@@ -0,0 +1,191 @@
+''' End-to-end benchmark of the validation pipeline against synthetic data
+
+    Usage: python -m benchmarks.run [--rows 100000 2000000] [--modes client server stream cache] [--seed 0]
+
+    Each size and mode runs in its own interpreter, so every run reads its own dataset
+    and reports its own peak memory.
+
+    Requires the `cryptography` package so the OAuth2.0 token cache can be seeded
+    and no browser sign-in is attempted.
+'''
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import subprocess
+
+from datetime import datetime
+
+from . import stub
+from . import generate
+
+
+root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+results = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'results.jsonl')
+
+
+def getCommit() -> str:
+    try:
+        output = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True)
+        return output.stdout.strip() or None
+    except OSError:
+        return None
+
+
+def getPeakRSS() -> float:
+    try:
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    except ImportError:
+        import psutil
+        return psutil.Process().memory_info().peak_wset / 1024 ** 2
+
+
+def prepare(path: str, workspace: str):
+    ''' Points the pipeline at the SQLite stand-in and stub CRM, then imports it '''
+
+    server = stub.serve(stub.buildAccounts(generate.getStoreNumbers(path)))
+    endpoint = f'http://127.0.0.1:{server.server_port}'
+
+    os.environ.update({
+        'ServerDB': 'benchmark',
+        'DatabaseDB': 'benchmark',
+        'UsernameDB': 'benchmark',
+        'PasswordDB': 'benchmark',
+        'RequestEndpointCRM': endpoint,
+        'TokenEndpointCRM': endpoint + '/token',
+        'AuthEndpointCRM': endpoint + '/authorize',
+        'AppIdCRM': 'benchmark',
+        'AppSecretCRM': 'benchmark',
+        'UsernameCRM': 'benchmark',
+        'PasswordCRM': 'benchmark'
+    })
+
+    from packages.logger import CustomLogger
+    from packages.tokens import TokenCache
+    from packages.cache import MovementCache
+    from packages.database import Database
+    from packages.dynamics import Dynamics365
+
+    CustomLogger.threshold = len(CustomLogger.levels)
+    CustomLogger.logfiles = {key: os.path.join(workspace, key) for key in ['events', 'errors']}
+
+    TokenCache.path = os.path.join(workspace, '.token_cache')
+    TokenCache('benchmark').save({'access_token': 'benchmark', 'refresh_token': 'benchmark', 'expires_in': 3600})
+
+    Database.connector = generate.connect(path)
+    MovementCache.directory = os.path.join(workspace, 'cache')
+    Dynamics365.exportDir = os.path.join(workspace, 'accounts.ndjson')
+    Dynamics365.storeDir = os.path.join(workspace, 'account_store.json')
+
+    import main
+    main.exportDir = os.path.join(workspace, '')
+
+    return main
+
+
+def measure(main, rows: int, mode: str) -> dict:
+    from packages.profiler import Profiler
+
+    Profiler.records.clear()
+    main.ControlFlow.mode = mode
+
+    start = time.perf_counter()
+    main.ControlFlow.execute()
+    elapsed = time.perf_counter() - start
+
+    stages = {}
+    for record in Profiler.records:
+        stages[record['stage']] = round(stages.get(record['stage'], 0) + record['wall'], 4)
+
+    result = {
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'commit': getCommit(),
+        'rows': rows,
+        'mode': mode,
+        'concurrent': main.ControlFlow.concurrent,
+        'shards': main.ControlFlow.shards,
+        'format': main.ControlFlow.format,
+        'seconds': round(elapsed, 4),
+        'rowsPerSecond': round(rows / elapsed),
+        'peakRSSMB': round(getPeakRSS(), 1),
+        'stages': stages
+    }
+
+    return result
+
+
+def report(result: dict) -> None:
+    print(
+        f"{result['rows']:>12,} rows  {result['mode']:<8} {result['seconds']:>9.3f}s  "
+        f"{result['rowsPerSecond']:>12,} rows/s  peak {result['peakRSSMB']:>8.1f} MB"
+    )
+
+    for stage, seconds in result['stages'].items():
+        print(f"{'':>14}{stage:<34} {seconds:>9.3f}s")
+
+
+def getArguments(args, rows: int, mode: str) -> list:
+    arguments = ['--single', '--no-record', '--rows', str(rows), '--modes', mode, '--seed', str(args.seed)]
+    arguments += ['--shards', str(args.shards), '--format', args.format]
+
+    return arguments + (['--concurrent'] if args.concurrent else [])
+
+
+def spawn(args, rows: int, mode: str) -> dict:
+    ''' Runs one size and mode in a fresh interpreter and returns the result it prints last '''
+    command = [sys.executable, '-m', 'benchmarks.run'] + getArguments(args, rows, mode)
+    output = subprocess.run(command, cwd=root, capture_output=True, text=True)
+
+    if output.returncode != 0:
+        print(f'{rows:>12,} rows  {mode:<8} failed:\n{output.stderr.strip()}')
+        return None
+
+    return json.loads(output.stdout.strip().splitlines()[-1])
+
+
+def main(arguments: list = None) -> None:
+    parser = argparse.ArgumentParser(description='Benchmark the validation pipeline')
+    parser.add_argument('--rows', type=int, nargs='+', default=[100000])
+    parser.add_argument('--modes', nargs='+', default=['client', 'server', 'stream', 'parallel', 'cache'])
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--concurrent', action='store_true', help='overlap the CRM download with the SQL fetch')
+    parser.add_argument('--shards', type=int, default=0, help='analyze StoreNumber shards across worker processes')
+    parser.add_argument('--format', default='csv', choices=['csv', 'csv.gz', 'parquet', 'feather'])
+    parser.add_argument('--no-record', action='store_true', help='do not append results to benchmarks/results.jsonl')
+    parser.add_argument('--single', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args(arguments)
+
+    if args.single:
+        pipeline = prepare(generate.getPath(args.rows[0], args.seed), tempfile.mkdtemp(prefix='benchmark-'))
+        pipeline.ControlFlow.concurrent = args.concurrent
+        pipeline.ControlFlow.shards = args.shards
+        pipeline.ControlFlow.format = args.format
+
+        print(json.dumps(measure(pipeline, args.rows[0], args.modes[0])))
+        return
+
+    for rows in args.rows:
+        path = generate.getPath(rows, args.seed)
+
+        if not os.path.exists(path):
+            print(f'Generating {rows:,} synthetic movement rows...')
+            generate.generate(rows, seed=args.seed, path=path)
+
+        for mode in args.modes:
+            result = spawn(args, rows, mode)
+
+            if result is None:
+                continue
+
+            report(result)
+
+            if not args.no_record:
+                with open(results, 'a+') as savefile:
+                    savefile.write(json.dumps(result) + '\n')
+
+
+if __name__ == '__main__':
+    main()
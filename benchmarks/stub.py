@@ -0,0 +1,134 @@
+''' Local stand-in for the Dataverse accounts endpoint and the OAuth2.0 token endpoint '''
+import re
+import json
+import time
+import zlib
+import threading
+import urllib.parse
+
+from http.server import BaseHTTPRequestHandler
+from http.server import ThreadingHTTPServer
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    ''' Serves paged accounts, answering with any status queued in `server.faults[skiptoken]` first
+        (None stalls the page for `server.stall` seconds), and answers token requests with the
+        (status, payload) in `server.token`
+    '''
+
+    pageSize: int = 5000
+
+    def log_message(self, format, *args):
+        return
+
+    def _send(self, payload: dict, status: int = 200) -> None:
+        body = json.dumps(payload).encode()
+
+        self.send_response(status)
+        if status in [429, 503]:
+            self.send_header('Retry-After', '0')
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    @staticmethod
+    def _match(record: dict, clause: str) -> bool:
+        for field, operator, value in re.findall(r"(\w+) (eq|ne|lt|le|gt|ge) ('[^']*'|[\w:.-]+)", clause):
+            actual = record.get(field)
+            expected = None if value == 'null' else value.strip("'")
+
+            if field == 'statuscode' and expected is not None:
+                expected = int(expected)
+
+            if operator == 'eq' and actual != expected:
+                return False
+            if operator == 'ne' and actual == expected:
+                return False
+            if operator in ['lt', 'le', 'gt', 'ge']:
+                if actual is None:
+                    return False
+                if operator == 'lt' and not actual < expected:
+                    return False
+                if operator == 'le' and not actual <= expected:
+                    return False
+                if operator == 'gt' and not actual > expected:
+                    return False
+                if operator == 'ge' and not actual >= expected:
+                    return False
+
+        return True
+
+    def do_GET(self):
+        url = urllib.parse.urlparse(self.path)
+        query = urllib.parse.parse_qs(url.query)
+
+        if not url.path.rstrip('/').endswith('accounts'):
+            return self._send({'error': 'not found'}, status=404)
+
+        clause = query.get('$filter', [''])[0]
+        skip = int(query.get('$skiptoken', ['0'])[0])
+
+        faults = self.server.faults.get(skip)
+        if faults:
+            status = faults.pop(0)
+
+            if status is None:
+                time.sleep(self.server.stall)
+            else:
+                return self._send({'error': 'injected'}, status=status)
+
+        records = [record for record in self.server.accounts if self._match(record, clause)]
+        fields = query.get('$select', [''])[0].split(',')
+
+        page = [
+            {field: record.get(field) for field in fields if field}
+            for record in records[skip:skip + self.pageSize]
+        ]
+        payload = {'value': page}
+
+        if skip + self.pageSize < len(records):
+            query['$skiptoken'] = [str(skip + self.pageSize)]
+            nextQuery = urllib.parse.urlencode({key: value[0] for key, value in query.items()})
+            payload['@odata.nextLink'] = f'http://{self.server.server_address[0]}:{self.server.server_port}{url.path}?{nextQuery}'
+
+        self._send(payload)
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length', 0))
+        form = urllib.parse.parse_qs(self.rfile.read(length).decode())
+
+        self.server.grants.append(form.get('grant_type', [None])[0])
+
+        status, payload = self.server.token
+        self._send(payload, status=status)
+
+
+def buildAccounts(storeNumbers: list, *, seed: int = 0) -> list:
+    statuses = [100000001, 100000002, 100000005, 100000006, 100000008]
+
+    accounts = [
+        {
+            'accountnumber': number,
+            'new_storestatus': statuses[(zlib.crc32(number.encode()) + seed) % len(statuses)],
+            'statuscode': 1,
+            'modifiedon': '2024-01-01T00:00:00Z'
+        }
+        for number in sorted(storeNumbers)
+    ]
+
+    return accounts
+
+
+def serve(accounts: list) -> ThreadingHTTPServer:
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StubHandler)
+    server.accounts = accounts
+    server.faults = {}
+    server.stall = 1.0
+    server.grants = []
+    server.token = (200, {'access_token': 'benchmark', 'refresh_token': 'benchmark', 'expires_in': 3600})
+    server.daemon_threads = True
+
+    threading.Thread(target=server.serve_forever, name='StubServer', daemon=True).start()
+
+    return server
@@ -1,86 +1,123 @@
+from __future__ import annotations
+
+import argparse
 import warnings
 
+from typing import TYPE_CHECKING
+from os.path import join
 from os.path import abspath
-from pandas import DataFrame
+from os.path import dirname
+from importlib import import_module
+from concurrent.futures import Future
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import as_completed
 
-from packages import data
 from packages import logger
 
 from packages.types import CustomDict
+from packages.types import Deferred
+from packages.profiler import Profiler
+
+if TYPE_CHECKING:
+    from pandas import DataFrame
+    from packages.export import Exporter
 
 
 warnings.simplefilter('ignore', UserWarning)
 
-exportDir = abspath(__file__).replace('main.py', 'Exports\\')
+exportDir = join(dirname(abspath(__file__)), 'Exports', '')
 log = logger.CustomLogger
 logger.setup()
 
 
 class ControlFlow():
 
-    Movement = data.Movement
-    Dynamics = data.Dynamics()
+    Movement = Deferred(lambda: import_module('packages.data').Movement)
+    Dynamics = Deferred(lambda: import_module('packages.data').Dynamics())
 
     previous = ["1/31/2024 12:00:00 AM", "2/29/2024 12:00:00 AM", "3/31/2024 12:00:00 AM"]
     timestamp = ["4/30/2024 12:00:00 AM", ]
     date = timestamp[0].split()[0].replace('/', '-')
+    lookback = 60
+    mode = 'client'
+    concurrent = False
+    shards = 0
+    cube = False
+    scoring = False
+
+    jobs = 4
+    periods: dict = {}
+
+    format = 'csv'
+    unfiltered = True
+    background = True
+    exporter: Exporter = None
 
     @classmethod
+    @Profiler.stage('ControlFlow.retrieve')
     def retrieve(cls) -> CustomDict:
         log.debug('Fetching Database Records...  (this may take a while)')
-        raw = cls.Movement.getRecords()
+        raw = cls.Movement.getRecords(cls.timestamp[0], cls.lookback, mode=cls.mode)
 
-        log.state('Separating Composite Datasets...')
-        filtered = cls.Movement.segregate(raw, cls.timestamp)
-        retroactive = cls.Movement.segregate(filtered.historical, cls.previous)
+        log.state('Condensing Windowed Aggregate Datasets...')
+        if cls.cube or cls.scoring:
+            cube = cls.Movement.pivot(raw, squares=cls.scoring)
+            package = cube.windows(cls.timestamp[0], window=len(cls.previous), lookback=cls.lookback)
 
-        log.state('Condensing to Aggregate Datasets...')
-        _current = cls.Movement.aggregate(filtered.current)
-        _previous = cls.Movement.aggregate(retroactive.current)
-        _historical = cls.Movement.aggregate(retroactive.historical)
-
-        log.state('Determining Historical Patterns...')
-        current = cls.Movement.summarize(_current)
-        previous = cls.Movement.summarize(_previous)
-        historical = cls.Movement.summarize(_historical)
-
-        package = {
-            'current': current,
-            'previous': previous,
-            'historical': historical
-        }
+            if cls.scoring:
+                package = cls.Movement.score(package, cube, cls.timestamp[0])
+        else:
+            package = cls.Movement.windows(raw, cls.timestamp, cls.previous)
 
-        return CustomDict(package)
+        return package
     
     
     @classmethod
-    def analyze(cls, package: CustomDict) -> DataFrame:
+    @Profiler.stage('ControlFlow.analyze')
+    def analyze(cls, package: CustomDict, name: str = 'unfiltered') -> DataFrame:
         log.debug('Comparing Current Month to Other Datasets...')
-        comparison = cls.Movement.compareTrend(
-            trend=package.historical,
-            previous=package.previous,
-            current=package.current
-        )
 
-        try:
-            comparison.to_csv(exportDir + "unfiltered.csv")
-        except PermissionError:
-            log.issue('Failed to export Unfiltered Frame to CSV - File is Open')
+        if cls.shards > 1:
+            comparison, flagged = cls.Movement.compareShards(
+                trend=package.historical,
+                previous=package.previous,
+                current=package.current,
+                shards=cls.shards
+            )
+
+        else:
+            comparison = cls.Movement.compareTrend(
+                trend=package.historical,
+                previous=package.previous,
+                current=package.current
+            )
+
+            log.debug('Identifying Potential Discrepancies...')
+            flagged = cls.Movement.showWarnings(comparison)
+
+        if cls.unfiltered:
+            exporter = cls.getExporter()
 
-        log.debug('Identifying Potential Discrepancies...')
-        flagged = cls.Movement.showWarnings(comparison)
+            if cls.background:
+                exporter.background(comparison, name, index=True)
+            elif exporter.write(comparison, name, index=True) is None:
+                log.issue('Failed to export Unfiltered Frame - Skipping...')
 
         return flagged
 
     @classmethod
-    def filter(cls, package: DataFrame):
+    @Profiler.stage('ControlFlow.filter')
+    def filter(cls, package: DataFrame, accounts: Future = None):
         log.debug('Filtering to Relevant Discrepancies...')
 
         log.debug('Removing Duplicates...')
         report = cls.Movement.clean(package)
 
         log.state('Removing Inactive Accounts...')
-        accounts, expected = cls.Dynamics.get_accounts()
+        if accounts is not None:
+            accounts, expected = accounts.result()
+        else:
+            accounts, expected = cls.Dynamics.get_accounts()
 
         if accounts is None or expected is None:
             log.issue('Unable to process account status filter - Skipping...')
@@ -97,51 +134,169 @@ class ControlFlow():
         return final
 
     @classmethod
-    def export(cls, data: DataFrame):
-        try:
-            data.to_csv(
-                f"{exportDir}Period Ending {cls.date}.csv", 
-                index=False
-            )
-        except PermissionError:
-            log.error('Failed To Export to CSV - file is currently open')
-            
-            status: bool = False
-            i = 1
-
-            while not status:
-                try:
-                    log.debug(f'Attempting to Export to CSV at: Exports\\Period Ending {cls.date} ({i}).csv')
-
-                    data.to_csv(
-                        f"{exportDir}Period Ending {cls.date} ({i}).csv", 
-                        index=False
-                    )
-
-                    status = True
-                except:
-                    log.error(f'Failed to Export CSV at destination: Exports\\Period Ending {cls.date} ({i}).csv')
-                    i += 1
+    def getExporter(cls) -> Exporter:
+        from packages.export import Exporter
+
+        if cls.exporter is None or cls.exporter.directory != exportDir:
+            cls.exporter = Exporter(exportDir, cls.format)
+
+        return cls.exporter
+
+    @classmethod
+    @Profiler.stage('ControlFlow.export')
+    def export(cls, data: DataFrame, name: str = None):
+        exporter = cls.getExporter()
+        exporter.write(data, name or f'Period Ending {cls.date}')
+
+        log.debug('Waiting on Background Exports...')
+        exporter.join()
         
         return
 
     @classmethod
     def execute(cls):
-        log.state('Fetching Movement Data...')
-        data = cls.retrieve()
+        with ThreadPoolExecutor(max_workers=1, thread_name_prefix='Accounts') as executor:
+            accounts = None
+
+            if cls.concurrent:
+                log.state('Fetching Account Data in the Background...')
+                accounts = executor.submit(lambda: cls.Dynamics.get_accounts())
+
+            log.state('Fetching Movement Data...')
+            data = cls.retrieve()
 
-        log.state('Preparing Initial Report...')
-        draft = cls.analyze(data)
+            log.state('Preparing Initial Report...')
+            draft = cls.analyze(data)
 
-        log.state('Finalizing Report...')
-        report = cls.filter(draft)
+            log.state('Finalizing Report...')
+            report = cls.filter(draft, accounts)
 
         log.state('Exporting Report File...')
         cls.export(report)
+
+        Profiler.report(f"{exportDir}Period Ending {cls.date}.json")
+
+    @classmethod
+    def backfill(cls, start: str, end: str):
+        with ThreadPoolExecutor(max_workers=1, thread_name_prefix='Accounts') as executor:
+            log.state('Fetching Account Data in the Background...')
+            accounts = executor.submit(lambda: cls.Dynamics.get_accounts())
+
+            log.state(f'Fetching Movement Data for Report Periods {start} through {end}...')
+            raw = cls.Movement.getRecords(start, cls.lookback, until=end, mode=cls.mode)
+
+            log.state('Condensing Trailing Window Datasets...')
+            packages = cls.Movement.rolling(
+                raw, start, end, window=len(cls.previous), lookback=cls.lookback, scoring=cls.scoring
+            )
+
+            for period, package in packages.items():
+                date = f'{period.month}-{period.day}-{period.year}'
+
+                log.state(f'Preparing Report for Period Ending {date}...')
+                draft = cls.analyze(package, f'unfiltered {date}')
+                report = cls.filter(draft, accounts)
+
+                log.state('Exporting Report File...')
+                cls.export(report, f'Period Ending {date}')
+
+        Profiler.report(f"{exportDir}Backfill {start.replace('/', '-')} to {end.replace('/', '-')}.json")
+
+    @classmethod
+    @Profiler.stage('ControlFlow.validate')
+    def validate(cls, wholesaler, period, accounts: Future) -> DataFrame:
+        date = f'{period.month}-{period.day}-{period.year}'
+        log.state(f'Validating WholesalerID {wholesaler} for Period Ending {date}...')
+
+        db = cls.Movement.db.fork()
+        try:
+            raw = cls.Movement.getRecords(period, cls.lookback, mode=cls.mode, wholesaler=wholesaler, db=db)
+        finally:
+            db.close()
+
+        cube = cls.Movement.pivot(raw, squares=cls.scoring)
+        package = cube.windows(period, window=len(cls.previous), lookback=cls.lookback)
+
+        if cls.scoring:
+            package = cls.Movement.score(package, cube, period)
+
+        draft = cls.analyze(package, f'unfiltered {date} - Wholesaler {wholesaler}')
+        report = cls.filter(draft, accounts)
+
+        cls.getExporter().write(report, f'Period Ending {date} - Wholesaler {wholesaler}')
+
+        return report.assign(WholesalerID=wholesaler, ReportPeriod=period)
+
+    @classmethod
+    def schedule(cls, wholesalers: list = None):
+        import pandas as pd
+
+        with ThreadPoolExecutor(max_workers=1, thread_name_prefix='Accounts') as background:
+            log.state('Fetching Account Data in the Background...')
+            accounts = background.submit(lambda: cls.Dynamics.get_accounts())
+
+            feeds = cls.Movement.getWholesalers(cls.timestamp[0], cls.lookback)
+            if wholesalers:
+                feeds = feeds[feeds['WholesalerID'].astype(str).isin([str(wholesaler) for wholesaler in wholesalers])]
+
+            log.state(f'Scheduling {len(feeds)} Wholesalers across {cls.jobs} Workers...')
+            cls.getExporter()
+            reports = []
+
+            with ThreadPoolExecutor(max_workers=cls.jobs, thread_name_prefix='Wholesaler') as executor:
+                tasks = {}
+
+                for wholesaler, latest in zip(feeds['WholesalerID'].tolist(), feeds['LatestPeriod']):
+                    period = pd.Timestamp(cls.periods.get(str(wholesaler), latest))
+                    tasks[executor.submit(cls.validate, wholesaler, period, accounts)] = wholesaler
+
+                for task in as_completed(tasks):
+                    try:
+                        reports.append(task.result())
+                        log.state(f'Finished WholesalerID {tasks[task]} ({len(reports)} of {len(tasks)})')
+                    except (Exception, SystemExit) as e:
+                        log.error(f'Validation Failed for WholesalerID {tasks[task]} ({type(e).__name__}: {e})')
+
+        if not reports:
+            log.issue('No Wholesaler Reports were Produced - Skipping Merged Report')
+        else:
+            log.state('Exporting Merged Wholesaler Report...')
+            merged = pd.concat(reports, ignore_index=True).sort_values('WholesalerID', kind='stable', ignore_index=True)
+            cls.export(merged, 'All Wholesalers')
+
+        Profiler.report(f"{exportDir}All Wholesalers.json")
         
         
 
 if __name__ == '__main__':
-    ControlFlow.execute()
+    parser = argparse.ArgumentParser(description='Power BI Data Validation Tool')
+    parser.add_argument('--summary', action='store_true', help='print a per-stage timing table after the run')
+    parser.add_argument('--profile', action='store_true', help='sample the run with cProfile and save Exports/profile.prof')
+    parser.add_argument('--backfill', nargs=2, metavar=('START', 'END'), help='write one report per Report Period from START through END (e.g. 1/31/2024 4/30/2024)')
+    parser.add_argument('--wholesalers', nargs='*', metavar='ID', help='validate each WholesalerID (all when none are given) as its own job at its latest Report Period')
+    parser.add_argument('--snapshot', action='store_true', help='save each SQL result as an Arrow snapshot under Exports/snapshots')
+    parser.add_argument('--replay', action='store_true', help='read movement from the saved snapshots instead of SQL Server')
+    args = parser.parse_args()
+
+    if args.snapshot or args.replay:
+        from packages.database import Database
+
+        Database.snapshots = args.snapshot
+        Database.replay = args.replay
+
+    run = ControlFlow.execute
+    if args.backfill:
+        run = lambda: ControlFlow.backfill(*args.backfill)
+    elif args.wholesalers is not None:
+        run = lambda: ControlFlow.schedule(args.wholesalers)
+
+    if args.profile:
+        with Profiler.sample(exportDir + 'profile.prof'):
+            run()
+    else:
+        run()
+
+    if args.summary:
+        print(Profiler.summary())
 
 
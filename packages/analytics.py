@@ -0,0 +1,167 @@
+import numpy as np
+import pandas as pd
+
+from . import rules
+from .logger import CustomLogger as log
+
+
+class Analytics():
+
+    @staticmethod
+    def TrendVar(x, y):
+        result = None
+
+        if x <= 0 or x is None:
+            result = None
+        elif y == 0 or y is None:
+            result = x
+        else:
+            result = y-x
+        
+        log.trace(f'Assigned Trend Variance of {result}')
+        return result
+
+    
+    @staticmethod
+    def MonthVar(x, y):
+        result = None
+
+        if x <= 0 or x is None:
+            result = None
+        elif y == 0 or y is None:
+            result = x
+        else:
+            result = y-x
+        
+        log.trace(f'Assigned MoM Variance of {result}')
+        return result
+    
+    @staticmethod
+    def TrendDelta(x, y):
+        result = None
+
+        if x <= 0 or x is None:
+            result = None
+        elif y == 0 or y is None:
+            result = -1
+        else:
+            try:
+                result = round((y/x), 2)
+            except ValueError:
+                result = 0
+        
+        log.trace(f'Assigned Trend Variance % of {result}')
+
+        return result
+    
+    @staticmethod
+    def MonthDelta(x, y):
+        result = None
+
+        if x <= 0 or x is None:
+            result = None
+        elif y == 0 or y is None:
+            result = -1
+        else:
+            try:
+                result = round((y/x), 2)
+            except ValueError:
+                result = 0
+        
+        log.trace(f'Assigned MoM Variance % of {result}')
+
+        return result
+
+    @staticmethod
+    def variance(x: np.ndarray, y: np.ndarray) -> np.ndarray:
+        return np.select([x <= 0, y == 0], [np.nan, x], default=y - x)
+
+    @staticmethod
+    def delta(x: np.ndarray, y: np.ndarray) -> np.ndarray:
+        with np.errstate(divide='ignore', invalid='ignore'):
+            exact = y / x
+            ratio = np.round(exact, 2)
+
+            scaled = np.abs(exact * 100)
+            ties = np.isclose(scaled - np.floor(scaled), 0.5)
+
+        ratio[ties] = [round(float(value), 2) for value in exact[ties]]
+
+        return np.select([x <= 0, y == 0], [np.nan, -1], default=ratio)
+
+    @staticmethod
+    def merge(trend: pd.DataFrame, previous: pd.DataFrame, current: pd.DataFrame) -> pd.DataFrame:
+        df = trend.rename(columns={'Qty': 'Trend'}).merge(
+            previous[['StoreNumber', 'UPC', 'Qty']].rename(columns={'Qty': 'LastMonth'}),
+            how='left',
+            on=['StoreNumber', 'UPC']
+        )
+        
+        comparison = df.merge(
+            current[['StoreNumber', 'UPC', 'Qty']].rename(columns={'Qty': 'CurrentMonth'}),
+            how='left',
+            on=['StoreNumber', 'UPC']
+        )
+
+        return comparison
+
+    @classmethod
+    def compare(cls, data: pd.DataFrame) -> pd.DataFrame:
+        trend, month, current = (
+            data[column].to_numpy(dtype='float64', na_value=np.nan)
+            for column in ['Trend', 'LastMonth', 'CurrentMonth']
+        )
+
+        data['TrendVar'] = cls.variance(trend, current)
+        data['MonthVar'] = cls.variance(month, current)
+        data['Trend%'] = cls.delta(trend, current)
+        data['Month%'] = cls.delta(month, current)
+
+        return data
+
+    @staticmethod
+    def score(cube, period, *, window: int = 12, season: int = 12) -> pd.DataFrame:
+        ''' Spread and z-score of each key's Qty over its trailing `window` periods, and its ratio to the calendar month `season` months earlier '''
+        current, following = cube.ordinal(period), cube.ordinal(period, side='right')
+        lower = current - window
+
+        count = cube.total(lower, current, 'Count')
+        total = cube.total(lower, current)
+        squares = cube.total(lower, current, 'Squares')
+
+        observed = cube.total(current, following, 'Count') > 0
+        value = np.where(observed, cube.total(current, following), np.nan)
+
+        earlier, later = cube.month(period, -season)
+        seasonal = cube.total(earlier, later, 'Count')
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            lastYear = np.where(seasonal > 0, cube.total(earlier, later) / seasonal, np.nan)
+
+            mean = total / count
+            variance = (squares - count * mean ** 2) / (count - 1)
+            deviation = np.where(count > 1, np.sqrt(np.clip(variance, 0, None)), np.nan)
+
+            zscore = np.where(deviation > 0, (value - mean) / deviation, np.nan)
+            ratio = np.where(lastYear > 0, np.round(value / lastYear, 2), np.nan)
+
+        scores = cube.keys.copy()
+        scores['Deviation'] = np.round(deviation, 2)
+        scores['ZScore'] = np.round(zscore, 2)
+        scores['Seasonal%'] = ratio
+
+        return scores
+
+    @staticmethod
+    def flags(data: pd.DataFrame) -> pd.Categorical:
+        return rules.Warnings.label(data)
+
+    @staticmethod
+    def annotate(data: pd.DataFrame, flags: pd.Categorical) -> pd.DataFrame:
+        mask = np.asarray(flags != '')
+
+        flagged = data.loc[mask].copy()
+        flagged['Flag'] = flags[mask]
+        flagged['Category'] = rules.Categories.label(flagged)
+
+        return flagged
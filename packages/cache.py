@@ -0,0 +1,105 @@
+import os
+import json
+
+import pandas as pd
+
+from datetime import datetime
+
+from . import queries
+from .logger import CustomLogger as log
+
+
+class MovementCache():
+    ''' Local Parquet store of aggregated movement, refreshed one Report Period at a time '''
+
+    directory = os.path.join(
+        os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'Exports', 'cache'
+    )
+    batch: int = 500
+
+    def __init__(self, db):
+        self.db = db
+
+        self.framePath = os.path.join(self.directory, 'movement.parquet')
+        self.watermarkPath = os.path.join(self.directory, 'watermark.json')
+
+    def _load(self) -> tuple:
+        if not (os.path.exists(self.framePath) and os.path.exists(self.watermarkPath)):
+            log.debug('No Movement Cache Found - Building from Scratch...')
+            return None, {}
+
+        try:
+            frame = pd.read_parquet(self.framePath)
+
+            with open(self.watermarkPath, 'r') as savefile:
+                watermark = json.load(savefile)
+
+        except Exception as e:
+            log.issue(f'Failed to Read Movement Cache ({e}) - Rebuilding...')
+            return None, {}
+
+        return frame, watermark.get('periods', {})
+
+    def _save(self, frame: pd.DataFrame, periods: dict) -> None:
+        os.makedirs(self.directory, exist_ok=True)
+
+        watermark = {
+            'updated': datetime.now().isoformat(timespec='seconds'),
+            'periods': periods
+        }
+
+        try:
+            frame.to_parquet(self.framePath, index=False)
+
+            with open(self.watermarkPath, 'w+') as savefile:
+                json.dump(watermark, savefile, indent=4)
+
+        except Exception as e:
+            log.issue(f'Failed to Write Movement Cache ({e}) - Continuing without Cache')
+
+        return
+
+    def _fetch(self, periods: list) -> pd.DataFrame:
+        frames = []
+
+        for start in range(0, len(periods), self.batch):
+            batch = periods[start:start + self.batch]
+            frames.append(self.db.execute(queries.fetch_aggregate(len(batch)), params=batch))
+
+        return pd.concat(frames, ignore_index=True)
+
+    def refresh(self, cutoff) -> pd.DataFrame:
+        log.debug('Comparing Report Periods against Movement Cache Watermark...')
+        fingerprint = self.db.execute(queries.fetch_fingerprint(), params=[cutoff])
+
+        current = {
+            str(period): [int(records), int(lastid)]
+            for period, records, lastid in fingerprint.itertuples(index=False)
+        }
+
+        cached, watermark = self._load()
+
+        periods = fingerprint['ReportPeriod'].tolist()
+        stale = [
+            period for period in periods 
+            if cached is None or watermark.get(str(period)) != current[str(period)]
+        ]
+        fresh = [period for period in periods if period not in stale]
+
+        log.debug(f'Reusing {len(fresh)} Cached Report Periods - Fetching {len(stale)}...')
+
+        frames = []
+        if cached is not None:
+            frames.append(cached[cached['ReportPeriod'].isin(fresh)])
+        if stale:
+            frames.append(self._fetch(stale))
+
+        if not frames:
+            return pd.DataFrame(columns=['StoreNumber', 'UPC', 'ReportPeriod', 'Qty'])
+
+        merged = self.db._conform(pd.concat(frames, ignore_index=True))
+
+        if stale or current != watermark:
+            self._save(merged, current)
+
+        return merged
@@ -0,0 +1,109 @@
+import numpy as np
+import pandas as pd
+
+from .types import CustomDict
+from .profiler import Profiler
+from .logger import CustomLogger as log
+
+
+class Cube():
+    ''' [StoreNumber.UPC] x ReportPeriod movement totals with prefix sums along the period axis '''
+
+    cells: int = 25000000
+    memo: int = 8
+    columns = ['StoreNumber', 'UPC', 'Qty']
+
+    @Profiler.stage('Cube.build')
+    def __init__(self, data: pd.DataFrame, *, squares: bool = False):
+        log.debug('Pivoting Aggregate Dataset into [StoreNumber.UPC] x ReportPeriod Cube...')
+        data = data.assign(ReportPeriod=pd.to_datetime(data['ReportPeriod']))
+        data = data.groupby(['StoreNumber', 'UPC', 'ReportPeriod'], as_index=False, observed=True)['Qty'].sum()
+
+        codes = data.groupby(['StoreNumber', 'UPC'], observed=True, sort=False).ngroup().to_numpy(dtype=np.int64)
+        self.labels, ordinals = np.unique(data['ReportPeriod'].to_numpy(dtype='datetime64[ns]'), return_inverse=True)
+        ordinals = ordinals.reshape(-1).astype(np.int64)
+
+        self.starts = np.flatnonzero(np.r_[True, codes[1:] != codes[:-1]]) if len(codes) else np.empty(0, dtype=np.int64)
+        self.keys = data.loc[self.starts, ['StoreNumber', 'UPC']].reset_index(drop=True)
+
+        self.periods = len(self.labels)
+        self.dense = len(self.starts) * (self.periods + 1) <= self.cells
+
+        values = {'Qty': data['Qty'].to_numpy(dtype=np.float64)}
+        if squares:
+            values['Squares'] = values['Qty'] ** 2
+
+        if self.dense:
+            log.debug(f'Building Dense Prefix Sums over {len(self.starts)} keys x {self.periods} periods')
+            self.totals = {'Count': self._accumulate(codes, ordinals, np.ones(len(codes), dtype=np.int32))}
+            self.totals.update({moment: self._accumulate(codes, ordinals, value) for moment, value in values.items()})
+
+        else:
+            log.debug(f'Building Sparse Prefix Sums over {len(codes)} observed cells')
+            self.composite = codes * (self.periods + 1) + ordinals
+            self.offsets = np.arange(len(self.starts), dtype=np.int64) * (self.periods + 1)
+            self.positions = {}
+            self.totals = {moment: np.r_[0, np.cumsum(value)] for moment, value in values.items()}
+
+    def ordinal(self, period, side: str = 'left') -> int:
+        ''' Rank of a Report Period among the distinct periods in the cube (its insertion point, if absent) '''
+        return int(np.searchsorted(self.labels, np.datetime64(pd.Timestamp(period), 'ns'), side=side))
+
+    def month(self, period, offset: int = 0) -> tuple:
+        ''' Rank bounds of the Report Periods falling in the calendar month `offset` months from the period '''
+        month = pd.Timestamp(period).to_datetime64().astype('datetime64[M]') + offset
+        months = self.labels.astype('datetime64[M]')
+
+        return int(np.searchsorted(months, month, side='left')), int(np.searchsorted(months, month, side='right'))
+
+    def _accumulate(self, codes: np.ndarray, ordinals: np.ndarray, value: np.ndarray) -> np.ndarray:
+        cube = np.zeros((len(self.starts), self.periods + 1), dtype=value.dtype)
+        np.add.at(cube, (codes, ordinals + 1), value)
+
+        return np.cumsum(cube, axis=1, out=cube)
+
+    def prefix(self, bound: int, moment: str = 'Qty') -> np.ndarray:
+        ''' Per-key total of a moment over every period ranked strictly before the bound '''
+        bound = int(np.clip(bound, 0, self.periods))
+
+        if self.dense:
+            return self.totals[moment][:, bound]
+
+        if bound not in self.positions:
+            if len(self.positions) >= self.memo:
+                self.positions.pop(next(iter(self.positions)))
+
+            self.positions[bound] = np.searchsorted(self.composite, self.offsets + bound, side='left')
+
+        position = self.positions[bound]
+
+        if moment == 'Count':
+            return position - self.starts
+
+        return self.totals[moment][position] - self.totals[moment][self.starts]
+
+    def total(self, lower: int, upper: int, moment: str = 'Qty') -> np.ndarray:
+        return self.prefix(upper, moment) - self.prefix(min(lower, upper), moment)
+
+    def mean(self, lower: int, upper: int) -> pd.DataFrame:
+        ''' Average Qty per Report Period for each key over the ranks [lower, upper), for keys with any movement '''
+        count = self.total(lower, upper, 'Count')
+        observed = count > 0
+
+        frame = self.keys[observed].reset_index(drop=True)
+        frame['Qty'] = self.total(lower, upper)[observed] / count[observed]
+
+        return frame[self.columns]
+
+    def windows(self, period, *, window: int = 3, lookback: int = 60) -> CustomDict:
+        ''' The period itself, the `window` periods before it, and every earlier period within `lookback` months '''
+        current, following = self.ordinal(period), self.ordinal(period, side='right')
+        cutoff = self.ordinal(pd.Timestamp(period) - pd.DateOffset(months=lookback))
+
+        package = {
+            'current': self.mean(current, following),
+            'previous': self.mean(max(current - window, cutoff), current),
+            'historical': self.mean(cutoff, current - window)
+        }
+
+        return CustomDict(package)
@@ -6,91 +6,118 @@ from dotenv import load_dotenv
 
 from . import queries
 from .types import CustomDict
+from .types import Deferred
+from .cube import Cube
+from .cache import MovementCache
+from .shards import Shards
+from .analytics import Analytics
 from .database import Database
 from .dynamics import Dynamics365
+from .profiler import Profiler
 from .logger import CustomLogger as log
 
 
-class Analytics():
+class Movement():
 
-    @staticmethod
-    def TrendVar(x, y):
-        result = None
+    db: Database = Deferred(Database)
 
-        if x <= 0 or x is None:
-            result = None
-        elif y == 0 or y is None:
-            result = x
-        else:
-            result = y-x
-        
-        log.trace(f'Assigned Trend Variance of {result}')
-        return result
-
-    
     @staticmethod
-    def MonthVar(x, y):
-        result = None
+    def getCutoff(period: str, lookback: int):
+        cutoff = pd.Timestamp(period) - pd.DateOffset(months=lookback)
 
-        if x <= 0 or x is None:
-            result = None
-        elif y == 0 or y is None:
-            result = x
-        else:
-            result = y-x
-        
-        log.trace(f'Assigned MoM Variance of {result}')
-        return result
-    
-    @staticmethod
-    def TrendDelta(x, y):
-        result = None
+        return cutoff.to_pydatetime()
 
-        if x <= 0 or x is None:
-            result = None
-        elif y == 0 or y is None:
-            result = -1
-        else:
-            try:
-                result = round((y/x), 2)
-            except ValueError:
-                result = 0
-        
-        log.trace(f'Assigned Trend Variance % of {result}')
-
-        return result
-    
-    @staticmethod
-    def MonthDelta(x, y):
-        result = None
+    @classmethod
+    def getPartitions(cls, cutoff, until, partitions: int) -> list:
+        periods = cls.db.execute(queries.fetch_periods(), params=[cutoff, until])
+        periods = periods.sort_values('ReportPeriod', ignore_index=True)
 
-        if x <= 0 or x is None:
-            result = None
-        elif y == 0 or y is None:
-            result = -1
-        else:
-            try:
-                result = round((y/x), 2)
-            except ValueError:
-                result = 0
-        
-        log.trace(f'Assigned MoM Variance % of {result}')
+        if periods.empty:
+            return [[cutoff, cutoff]]
 
-        return result
+        preceding = periods['Records'].cumsum() - periods['Records']
+        periods['Partition'] = (preceding * partitions // periods['Records'].sum()).clip(upper=partitions - 1)
 
-class Movement():
+        bounds = periods.groupby('Partition')['ReportPeriod'].agg(['min', 'max'])
 
-    db: Database = Database()
+        return [
+            [lower.to_pydatetime(), upper.to_pydatetime()]
+            for lower, upper in bounds.itertuples(index=False)
+        ]
 
     @classmethod
-    def getRecords(cls) -> pd.DataFrame:
-        results = cls.db.execute(queries.fetch_all)
+    @Profiler.stage('Movement.getRecords')
+    def getRecords(cls, period: str, lookback: int = 60, *, until: str = None, mode: str = 'client', wholesaler=None, db: Database = None) -> pd.DataFrame:
+        ''' Movement from `lookback` months before the period through `until` (the period itself by default) '''
+        db = db or cls.db
+        cutoff = cls.getCutoff(period, lookback)
+        until = pd.Timestamp(until or period).to_pydatetime()
+        log.debug(f'Limiting Records to Report Periods from {cutoff:%m/%d/%Y} through {until:%m/%d/%Y}')
+
+        params = [cutoff, until]
+        if wholesaler is not None:
+            log.debug(f'Limiting Records to WholesalerID {wholesaler}')
+            params.append(wholesaler)
+
+            if mode in ['cache', 'parallel']:
+                log.debug(f'Fetch Mode [{mode}] covers the whole table - Reading WholesalerID {wholesaler} Directly...')
+                mode = 'client'
+
+        filtered = wholesaler is not None
+
+        if mode == 'server':
+            log.debug('Aggregating [StoreNumber.UPC.ReportPeriod] keys on SQL Server...')
+            results = db.execute(queries.fetch_aggregate(ranged=True, wholesaler=filtered), params=params)
+        elif mode == 'cache':
+            log.debug('Refreshing Cached [StoreNumber.UPC.ReportPeriod] keys...')
+            results = MovementCache(db).refresh(cutoff)
+            results = results[pd.to_datetime(results['ReportPeriod']) <= until].reset_index(drop=True)
+        elif mode == 'parallel':
+            log.debug('Reading Report Period Partitions in Parallel...')
+            results = db.parallel(
+                queries.fetch_window(ranged=True), 
+                cls.getPartitions(cutoff, until, db.workers)
+            )
+        elif mode == 'stream':
+            log.debug('Aggregating [StoreNumber.UPC.ReportPeriod] keys while streaming...')
+            results = db.stream(
+                queries.fetch_window(ranged=True, wholesaler=filtered), 
+                params=params, 
+                keys=['StoreNumber', 'UPC', 'ReportPeriod'], 
+                value='Qty'
+            )
+        else:
+            results = db.execute(queries.fetch_window(ranged=True, wholesaler=filtered), params=params)
 
         return results
-    
+
+    @classmethod
+    def getWholesalers(cls, period: str, lookback: int = 60) -> pd.DataFrame:
+        cutoff = cls.getCutoff(period, lookback)
+        log.debug(f'Listing Wholesalers Reporting on or after {cutoff:%m/%d/%Y}')
+
+        periods = cls.db.execute(queries.fetch_wholesalers(), params=[cutoff])
+        periods['ReportPeriod'] = pd.to_datetime(periods['ReportPeriod'])
+
+        log.debug('Taking the Latest Report Period per WholesalerID after Conforming Dates...')
+        wholesalers = periods.groupby('WholesalerID', as_index=False, observed=True).agg(
+            LatestPeriod=('ReportPeriod', 'max'),
+            Records=('Records', 'sum')
+        )
+
+        return wholesalers.sort_values('Records', ascending=False, ignore_index=True)
+
     @staticmethod
-    def segregate(data, cutoff: list) -> CustomDict:
+    def periods(data: pd.DataFrame, periods: list) -> list:
+        if pd.api.types.is_datetime64_any_dtype(data['ReportPeriod']):
+            return [pd.Timestamp(period) for period in periods]
+
+        return periods
+
+    @classmethod
+    def segregate(cls, data, cutoff: list) -> CustomDict:
         log.debug(f'Segregating Data using Cutoff Period: {cutoff[-1]}')
+        cutoff = cls.periods(data, cutoff)
 
         historical = data[~data['ReportPeriod'].isin(cutoff)]
         current = data[data['ReportPeriod'].isin(cutoff)]
@@ -102,83 +129,130 @@ class Movement():
 
         return CustomDict(package)
 
+    @classmethod
+    def label(cls, data: pd.DataFrame, current: list, previous: list) -> pd.Series:
+        log.debug(f'Labelling Report Periods using Cutoff Period: {current[-1]}')
+
+        lookup = {period: 'previous' for period in cls.periods(data, previous)}
+        lookup.update({period: 'current' for period in cls.periods(data, current)})
+
+        windows = data['ReportPeriod'].map(lookup).fillna('historical')
+
+        return windows.astype('category').rename('Window')
+
+    @classmethod
+    @Profiler.stage('Movement.windows')
+    def windows(cls, data: pd.DataFrame, current: list, previous: list) -> CustomDict:
+        log.debug('Condensing Dataset into Unique [Window.StoreNumber.UPC.ReportPeriod] keys')
+        keys = [cls.label(data, current, previous), 'StoreNumber', 'UPC', 'ReportPeriod']
+        summarized = data.groupby(keys, observed=True)['Qty'].sum()
+
+        log.debug('Averaging Dataset into unique [Window.StoreNumber.UPC] pairs')
+        average = summarized.groupby(level=[0, 1, 2], observed=True).mean()
+        average = pd.to_numeric(average, errors='coerce')
+
+        observed = set(average.index.get_level_values(0).unique())
+
+        package = {
+            window: (
+                average.xs(window, level=0).reset_index()
+                if window in observed
+                else pd.DataFrame(columns=['StoreNumber', 'UPC', 'Qty'])
+            )
+            for window in ['current', 'previous', 'historical']
+        }
+
+        return CustomDict(package)
+
+    @staticmethod
+    def pivot(data: pd.DataFrame, *, squares: bool = False) -> Cube:
+        return Cube(data, squares=squares)
+
+    @classmethod
+    @Profiler.stage('Movement.rolling')
+    def rolling(cls, data: pd.DataFrame, start: str, end: str, *, window: int = 3, lookback: int = 60, scoring: bool = False) -> dict:
+        ''' Trailing window means for every ReportPeriod in [start, end] from one set of prefix sums '''
+        periods = pd.to_datetime(data['ReportPeriod'])
+        periods = periods[periods.between(pd.Timestamp(start), pd.Timestamp(end))]
+        targets = sorted(pd.Timestamp(period) for period in periods.unique())
+
+        if not targets:
+            log.issue(f'No Report Periods found between {start} and {end}')
+            return {}
+
+        cube = cls.pivot(data, squares=scoring)
+
+        packages = {}
+        for target in targets:
+            log.debug(f'Computing Trailing Windows for Report Period: {target:%m/%d/%Y}')
+            packages[target] = cube.windows(target, window=window, lookback=lookback)
+
+            if scoring:
+                packages[target] = cls.score(packages[target], cube, target)
+
+        return packages
+
     @staticmethod
     def aggregate(data: pd.DataFrame):
         log.debug('Condensing Dataset into Unique [StoreNumber.UPC.ReportPeriod] keys')
-        summarized = data.groupby(['StoreNumber', 'UPC', 'ReportPeriod'], as_index=False)['Qty'].sum()
+        summarized = data.groupby(['StoreNumber', 'UPC', 'ReportPeriod'], as_index=False, observed=True)['Qty'].sum()
 
         return summarized
 
     @staticmethod
     def summarize(data: pd.DataFrame) -> pd.DataFrame:
         log.debug('Averaging Dataset into unique [StoreNumber.UPC] pairs')
-        average = data.groupby(['StoreNumber', 'UPC'], as_index=False)['Qty'].mean()
+        average = data.groupby(['StoreNumber', 'UPC'], as_index=False, observed=True)['Qty'].mean()
         average['Qty'] = pd.to_numeric(average['Qty'], errors='coerce')
 
         return average
 
     @staticmethod
-    def compareTrend(*, trend: pd.DataFrame, previous: pd.DataFrame, current: pd.DataFrame):
-        log.debug('Merging Trend and LastMonth Datasets...')      
-        df = trend.merge(
-            previous[['StoreNumber', 'UPC', 'Qty']],
-            how='left',
-            on=['StoreNumber', 'UPC']
-        )
-        
-        log.debug('Adding CurrentMonth Dataset...')
-        comparison = df.merge(
-            current[['StoreNumber', 'UPC', 'Qty']],
-            how='left',
-            on=['StoreNumber', 'UPC']
-        )
+    @Profiler.stage('Movement.score')
+    def score(package: CustomDict, cube: Cube, period, *, window: int = 12) -> CustomDict:
+        log.debug(f'Scoring [StoreNumber.UPC] pairs against their Trailing {window} Periods...')
+        scores = Analytics.score(cube, period, window=window)
 
-        comparison.columns = ['StoreNumber', 'UPC', 'Trend', 'LastMonth', 'CurrentMonth']
+        package.historical = package.historical.merge(scores, how='left', on=['StoreNumber', 'UPC'])
 
-        log.state('Analyzing Performance Deltas...')
+        return package
 
-        log.debug('Creating Comparison of Average Historical Trend to Current Month')
-        comparison['TrendVar'] = comparison.apply(
-            lambda x: Analytics.TrendVar(x['Trend'], x['CurrentMonth']),
-            axis=1
-        )
+    @staticmethod
+    @Profiler.stage('Movement.compareTrend')
+    def compareTrend(*, trend: pd.DataFrame, previous: pd.DataFrame, current: pd.DataFrame):
+        log.debug('Merging Trend, LastMonth and CurrentMonth Datasets...')
+        comparison = Analytics.merge(trend, previous, current)
 
-        log.debug('Creating Comparison of LastMonth to Current Month')
-        comparison['MonthVar'] = comparison.apply(
-            lambda x: Analytics.MonthVar(x['LastMonth'], x['CurrentMonth']),
-            axis=1
-        )
+        log.state('Analyzing Performance Deltas...')
 
-        log.debug('Creating Comparison of Average Historical Trend to Current Month as a %')
-        comparison['Trend%'] = comparison.apply(
-            lambda x: Analytics.TrendDelta(x['Trend'], x['CurrentMonth']),
-            axis=1
-        )
+        log.debug('Creating Trend and MoM Comparisons to Current Month')
+        comparison = Analytics.compare(comparison)
 
-        log.debug('Creating Comparison of LastMonth to Current Month as a %')
-        comparison['Month%'] = comparison.apply(
-            lambda x: Analytics.MonthDelta(x['LastMonth'], x['CurrentMonth']),
-            axis=1
-        )
+        return comparison
 
+    @staticmethod
+    @Profiler.stage('Movement.compareShards')
+    def compareShards(*, trend: pd.DataFrame, previous: pd.DataFrame, current: pd.DataFrame, shards: int):
+        log.state('Analyzing Performance Deltas across StoreNumber Shards...')
+        comparison, flagged = Shards.analyze(
+            trend=trend,
+            previous=previous,
+            current=current,
+            shards=shards
+        )
 
-        return comparison
+        return comparison, flagged
 
     @staticmethod
+    @Profiler.stage('Movement.showWarnings')
     def showWarnings(data: pd.DataFrame):
-        df = data.loc[(
-            ((data['Trend%'] < 0.8) & (data['TrendVar'] < -5)) |
-            ((data['Month%'] < 0.8) & (data['MonthVar'] < -5)) |
-            ((data['CurrentMonth'] == 0) & (data['Trend'] > 10)) |
-            ((data['CurrentMonth'].isnull()) & (data['Trend'] > 10)) |
-            ((data['CurrentMonth'] == 0) & (data['LastMonth'] > 10)) |
-            ((data['CurrentMonth'].isnull()) & (data['LastMonth'] > 10))
-        )]
-        
+        log.debug('Evaluating Warning Rules...')
+        df = Analytics.annotate(data, Analytics.flags(data))
 
         return df
     
     @staticmethod
+    @Profiler.stage('Movement.clean')
     def clean(data: pd.DataFrame):
         original = data.shape[0]
         report = data.drop_duplicates(subset=['StoreNumber', 'UPC'], keep='first')
@@ -190,6 +264,9 @@ class Movement():
 
 class Dynamics():
 
+    concurrent: bool = False
+    delta: bool = False
+
     def __init__(self):
         self.connection = self.ConnectToDynamics365()
         self.authenticate()
@@ -217,21 +294,19 @@ class Dynamics():
     def authenticate(self):
         self.connection.authenticate()
 
+    @Profiler.stage('Dynamics.get_accounts')
     def get_accounts(self):
-        accounts = self.connection.getAccounts()
+        if self.delta:
+            accounts = self.connection.syncAccounts(concurrent=self.concurrent)
+        else:
+            accounts = self.connection.getAccounts(concurrent=self.concurrent)
+
+        if self.connection.failed:
+            log.issue('Account Data is Incomplete - Skipping Account Filter')
+            return None, None
+
         if len(accounts) == 0:
             log.issue('Failed to Retrieve Account Data')
             return None, None
 
-        active = [
-            record["accountnumber"]
-            for record in accounts
-        ]
-
-        expected = [
-            record["accountnumber"] 
-            for record in accounts
-            if record["new_storestatus"] not in [100000008, 100000006, 100000005]
-        ]
-
-        return active, expected
+        return accounts.active(), accounts.expected()
@@ -1,24 +1,43 @@
 import os
 import sys
-import pyodbc
+import copy
 
 import pandas as pd
 
 from dotenv import load_dotenv
+from concurrent.futures import ThreadPoolExecutor
 
+from . import queries
 from .types import CustomDict
+from .snapshot import Snapshot
 from .dynamics import Dynamics365
+from .profiler import Profiler
 from .logger import CustomLogger as log
 
 
 class Database():
+    chunksize: int = 250000
+    memoryLimit: int = 512
+
+    connector = None
+    workers: int = 4
+
+    snapshots: bool = False
+    replay: bool = False
+
     def __init__(self):
-        self.cursor: pyodbc.Cursor = None
-        self.connection: pyodbc.Connection = None
+        self.cursor: 'pyodbc.Cursor' = None
+        self.connection: 'pyodbc.Connection' = None
+        self.version: str = None
 
-        self.env: CustomDict = self._loadEnv()
         self.structure: list = self._structure()
 
+        if self.replay:
+            log.state('Replaying Database Snapshots - SQL Server will not be Contacted')
+            self.env = None
+            return
+
+        self.env: CustomDict = self._loadEnv()
         self.connect()
     
     @staticmethod
@@ -43,6 +62,34 @@ class Database():
 
         return build
     
+    @staticmethod
+    def _schema():
+        build = {
+            "WholesalerID": "category",
+            "StoreNumber": "category",
+            "UPC": "category",
+            "Qty": "integer",
+            "ReportPeriod": "datetime"
+        }
+
+        return build
+
+    @classmethod
+    def _conform(cls, records: pd.DataFrame) -> pd.DataFrame:
+        for column, dtype in cls._schema().items():
+            if column not in records.columns:
+                continue
+
+            if dtype == 'integer':
+                records[column] = pd.to_numeric(records[column], errors='coerce', downcast='integer')
+            elif dtype == 'datetime':
+                if not pd.api.types.is_datetime64_any_dtype(records[column]):
+                    records[column] = pd.to_datetime(records[column], errors='coerce')
+            else:
+                records[column] = records[column].astype(dtype)
+
+        return records
+    
     @staticmethod
     def _loadEnv():
         log.debug('Loading Database Credentials from .env file...')
@@ -79,13 +126,20 @@ class Database():
 
         return dsn
     
+    def spawn(self, dsn: str = None):
+        if self.connector is not None:
+            return type(self).connector()
+
+        import pyodbc
+        return pyodbc.connect(dsn or self._getConnectionString(self.env))
+
     def connect(self):
         dsn = self._getConnectionString(self.env)
 
         log.debug('Attempting to Connect to SQL Server...')
 
         try:
-            self.connection = pyodbc.connect(dsn)
+            self.connection = self.spawn(dsn)
             self.cursor = self.connection.cursor()
             log.state('Established a Connection to SQL Server')
         except Exception as e:
@@ -96,8 +150,129 @@ class Database():
 
         return
 
-    def execute(self, query: str):
+    def fork(self) -> 'Database':
+        ''' Copy of this client on its own connection, for reading alongside it from another thread '''
+        clone = copy.copy(self)
+        clone.connection = None if self.replay else self.spawn()
+        clone.cursor = None
+
+        return clone
+
+    def close(self) -> None:
+        if self.connection is not None:
+            self.connection.close()
+            self.connection = None
+
+    def fingerprint(self) -> str:
+        if self.version is None:
+            log.debug('Fingerprinting Movement Table...')
+            version = pd.read_sql(queries.fetch_version(), self.connection)
+            self.version = '-'.join(str(value) for value in version.iloc[0].tolist())
+
+        return self.version
+
+    def _snapshot(self, query: str, params, read):
+        if not (self.snapshots or self.replay):
+            return read()
+
+        snapshot = Snapshot(query, params)
+
+        if self.replay:
+            records = snapshot.load()
+
+            if records is None:
+                log.fatal(f'No Snapshot Recorded for Query {snapshot.key} - Run with --snapshot First')
+                sys.exit(0)
+
+            return records
+
+        fingerprint = self.fingerprint()
+        records = snapshot.load(fingerprint)
+
+        if records is None:
+            records = read()
+            snapshot.save(records, fingerprint)
+
+        return records
+
+    def _read(self, query: str, params: list = None) -> pd.DataFrame:
         log.debug('Reading Database...')
-        records = pd.read_sql(query, self.connection)
+        records = pd.read_sql(query, self.connection, params=params)
+
+        return self._conform(records)
+
+    @Profiler.stage('Database.execute')
+    def execute(self, query: str, params: list = None):
+        return self._snapshot(query, params, lambda: self._read(query, params))
+
+    @staticmethod
+    def _consolidate(partials: list, keys: list, value: str) -> pd.DataFrame:
+        combined = pd.concat(partials, ignore_index=True)
+        summarized = combined.groupby(keys, as_index=False, observed=True)[value].sum()
+
+        return summarized
+
+    @Profiler.stage('Database.stream')
+    def stream(self, query: str, params: list = None, *, keys: list, value: str):
+        return self._snapshot(query, [params, keys, value], lambda: self._stream(query, params, keys, value))
+
+    def _stream(self, query: str, params: list, keys: list, value: str) -> pd.DataFrame:
+        log.debug(f'Streaming Database in Chunks of {self.chunksize} rows...')
+
+        ceiling = self.memoryLimit * 1024 ** 2
+        threshold = ceiling
+        partials, buffered = [], 0
+
+        chunks = pd.read_sql(query, self.connection, params=params, chunksize=self.chunksize)
+
+        for batch, chunk in enumerate(chunks):
+            partial = chunk.groupby(keys, as_index=False)[value].sum()
+            del chunk
+
+            partials.append(partial)
+            buffered += partial.memory_usage(deep=True).sum()
+            log.trace(f'Aggregated Chunk No. {batch} into {partial.shape[0]} keys')
+
+            if buffered > threshold and len(partials) > 1:
+                log.debug('Consolidating Running Aggregates...')
+                partials = [self._consolidate(partials, keys, value)]
+                buffered = partials[0].memory_usage(deep=True).sum()
+
+                if buffered > threshold:
+                    log.issue(f'Running Aggregate Exceeds Memory Limit of {self.memoryLimit} MB')
+
+                threshold = max(ceiling, buffered * 2)
+
+        if not partials:
+            return pd.DataFrame(columns=keys + [value])
+
+        return self._conform(self._consolidate(partials, keys, value))
+
+    def _fetchPartition(self, query: str, params: list) -> pd.DataFrame:
+        connection = self.spawn()
+
+        try:
+            records = pd.read_sql(query, connection, params=params)
+        finally:
+            connection.close()
 
         return records
+
+    @Profiler.stage('Database.parallel')
+    def parallel(self, query: str, partitions: list) -> pd.DataFrame:
+        return self._snapshot(query, partitions, lambda: self._parallel(query, partitions))
+
+    def _parallel(self, query: str, partitions: list) -> pd.DataFrame:
+        log.debug(f'Reading {len(partitions)} Partitions over {self.workers} Connections...')
+
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            futures = [
+                executor.submit(self._fetchPartition, query, params)
+                for params in partitions
+            ]
+
+            frames = [future.result() for future in futures]
+
+        records = pd.concat(frames, ignore_index=True)
+
+        return self._conform(records)
@@ -1,20 +1,108 @@
+import io
 import os
 import json
-import requests
+import time
+import threading
+import email.utils
+
+from array import array
+
+from datetime import datetime
+from datetime import timezone
+from datetime import timedelta
+from concurrent.futures import ThreadPoolExecutor
 
 from .types import CustomDict
 from .oauth2 import OAuth2Flow
+from .profiler import Profiler
 from .logger import CustomLogger as log
 
 
+class AccountPages():
+    ''' Account numbers, store statuses and modified stamps kept as columns, filled one page at a time '''
+
+    inactive = (100000008, 100000006, 100000005)
+
+    def __init__(self, audit: str = None, *, buffered: bool = False):
+        self.numbers: list = []
+        self.statuses: array = array('l')
+        self.modified: list = []
+
+        self.lock = threading.Lock()
+        self.audit = io.StringIO() if buffered else None
+
+        if audit:
+            os.makedirs(os.path.dirname(audit), exist_ok=True)
+            self.audit = open(audit, 'w+')
+
+    def __len__(self) -> int:
+        return len(self.numbers)
+
+    def extend(self, numbers: list, statuses: list, modified: list, lines: str = '') -> None:
+        with self.lock:
+            self.numbers.extend(numbers)
+            self.statuses.extend(statuses)
+            self.modified.extend(modified)
+
+            if self.audit is not None and lines:
+                self.audit.write(lines)
+
+    def add(self, page: list) -> None:
+        ''' Parses one OData page into the column buffers and appends it to the NDJSON audit file '''
+        numbers = [record.get('accountnumber') for record in page]
+        statuses = [-1 if record.get('new_storestatus') is None else record['new_storestatus'] for record in page]
+        modified = [record.get('modifiedon') for record in page]
+
+        lines = ''.join(json.dumps(record) + '\n' for record in page) if self.audit is not None else ''
+
+        self.extend(numbers, statuses, modified, lines)
+
+    def merge(self, pages: 'AccountPages') -> None:
+        ''' Appends another set of pages after these, along with any audit lines it buffered '''
+        lines = pages.audit.getvalue() if isinstance(pages.audit, io.StringIO) else ''
+
+        self.extend(pages.numbers, pages.statuses, pages.modified, lines)
+
+    def close(self) -> None:
+        if self.audit is not None:
+            self.audit.close()
+            self.audit = None
+
+    def active(self) -> frozenset:
+        return frozenset(self.numbers)
+
+    def expected(self) -> frozenset:
+        return frozenset(
+            number for number, status in zip(self.numbers, self.statuses)
+            if status not in self.inactive
+        )
+
+    def records(self):
+        ''' (accountnumber, new_storestatus, modifiedon) rows, with missing statuses restored to None '''
+        for number, status, modified in zip(self.numbers, self.statuses, self.modified):
+            yield number, (None if status == -1 else status), modified
+
+
 class Dynamics365():
     token: str = None
     version: str = "api/data/v9.2/" 
 
-    exportDir = os.path.abspath(__file__).replace('packages\\dynamics.py', 'Exports\\accounts.json')
+    workers: int = 4
+    retries: int = 5
+    backoff: float = 1.0
+    timeout: float = 60.0
+    boundaries: str = '123456789'
+    resyncDays: int = 7
+
+    exportDir = os.path.join(
+        os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'Exports', 'accounts.ndjson'
+    )
+    storeDir = os.path.join(
+        os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'Exports', 'account_store.json'
+    )
     
     def __init__(self, endpoints: CustomDict, return_raw: bool = False, format_values: bool = True):
-        self.accounts = []
+        self.accounts = AccountPages()
         
         self._baseURL = endpoints.requestURL
         self.clientID = endpoints.id
@@ -27,6 +115,8 @@ class Dynamics365():
         self.formatValues = format_values
 
         self.OAuthFlow = OAuth2Flow(endpoints)
+        self._session = None
+        self.failed = False
 
 
     @property
@@ -35,9 +125,21 @@ class Dynamics365():
             return self._baseURL
         return self._baseURL + '/'
     
-    def request(self, url: str, *, batch: int = 0) -> json:
-        log.trace(f'Requesting Batch No. {batch}')
+    @property
+    def session(self) -> 'requests.Session':
+        if self._session is None:
+            import requests
+            from requests.adapters import HTTPAdapter
+
+            adapter = HTTPAdapter(pool_connections=self.workers, pool_maxsize=self.workers)
+
+            self._session = requests.Session()
+            self._session.mount('https://', adapter)
+            self._session.mount('http://', adapter)
+
+        return self._session
 
+    def getHeaders(self) -> dict:
         headers = {
             'Authorization': 'Bearer ' + self.token,
             'Accept': 'application/json',
@@ -46,16 +148,92 @@ class Dynamics365():
             'OData-Version': '4.0'
         }
 
-        response = requests.get(url, headers=headers)
-        if response.status_code == 200:
-            log.debug(f'Batch Request Successful - ID {batch}')
-        
-        data = response.json()
+        return headers
+
+    @staticmethod
+    def getDelay(response, default: float) -> float:
+        ''' Seconds to wait from a Retry-After header given in seconds or as an HTTP-date, else the default '''
+        value = response.headers.get('Retry-After')
+
+        if value is None:
+            return default
+
+        try:
+            return max(float(value), 0.0)
+        except ValueError:
+            pass
+
+        try:
+            retryAt = email.utils.parsedate_to_datetime(value)
+            return max((retryAt - datetime.now(timezone.utc)).total_seconds(), 0.0)
+        except (TypeError, ValueError):
+            return default
+
+    def fetch(self, url: str, *, batch: int = 0) -> json:
+        import requests
+
+        log.trace(f'Requesting Batch No. {batch}')
+
+        for attempt in range(self.retries + 1):
+            try:
+                response = self.session.get(url, headers=self.getHeaders(), timeout=self.timeout)
+            except requests.exceptions.Timeout:
+                log.error(f'Batch Request Timed Out - ID {batch} (after {self.timeout} seconds)')
+                self.failed = True
+                return {'value': []}
+
+            if response.status_code not in [429, 503] or attempt == self.retries:
+                break
+
+            delay = self.getDelay(response, self.backoff * 2 ** attempt)
+            log.issue(f'Request Throttled - Retrying Batch No. {batch} in {delay} seconds')
+            time.sleep(delay)
+
+        if response.status_code != 200:
+            log.error(f'Batch Request Failed - ID {batch} (HTTP {response.status_code})')
+            self.failed = True
+            return {'value': []}
+
+        log.debug(f'Batch Request Successful - ID {batch}')
+
+        return response.json()
+
+    def request(self, url: str, *, batch: int = 0) -> json:
+        data = self.fetch(url, batch=batch)
 
-        self.accounts.extend(data["value"])
+        self.accounts.add(data["value"])
 
         return data
 
+    def collect(self, url: str, *, sink: AccountPages = None) -> list:
+        ''' Follows every nextLink from a url, into the sink page by page when given, else into a list '''
+        records = []
+        store = sink.add if sink is not None else records.extend
+
+        response = self.fetch(url)
+        store(response["value"])
+
+        batchid = 1
+
+        while "@odata.nextLink" in response:
+            response = self.fetch(response["@odata.nextLink"], batch=batchid)
+            store(response["value"])
+            batchid += 1
+
+        return records
+
+    def getPartitions(self) -> list:
+        bounds = list(self.boundaries)
+
+        partitions = [f"accountnumber lt '{bounds[0]}'"]
+        partitions.extend([
+            f"accountnumber ge '{lower}' and accountnumber lt '{upper}'"
+            for lower, upper in zip(bounds, bounds[1:])
+        ])
+        partitions.append(f"accountnumber ge '{bounds[-1]}'")
+        partitions.append("accountnumber eq null")
+
+        return partitions
     
     def authenticate(self):
         log.state('Simulating OAuth2.0 Authorization Flow...')
@@ -64,26 +242,143 @@ class Dynamics365():
     def getRequestURL(self, entity):
         return f'{self.baseURL}{self.version}/{entity}/'
 
-    def getAccounts(self):
+    @Profiler.stage('Dynamics365.getAccounts')
+    def getAccounts(self, *, concurrent: bool = False):
         log.debug('Requesting [dbo.Accounts] Table...')
 
+        log.debug('Streaming Account Data to Audit File...')
+        self.accounts = AccountPages(self.exportDir)
+        self.failed = False
 
-        url = self.getRequestURL('accounts') + "?$select=accountnumber,new_storestatus&$filter=statuscode eq 1"
-        response = self.request(url)
+        url = self.getRequestURL('accounts') + "?$select=accountnumber,new_storestatus,modifiedon&$filter=statuscode eq 1"
 
-        batchid = 1
+        try:
+            if concurrent:
+                urls = [f'{url} and ({partition})' for partition in self.getPartitions()]
+                log.debug(f'Requesting {len(urls)} Account Ranges across {self.workers} Workers...')
 
-        while "@odata.nextLink" in response:
-            response = self.request(response["@odata.nextLink"], batch=batchid)
-            batchid += 1
+                ranges = [AccountPages(buffered=self.accounts.audit is not None) for _ in urls]
+
+                with ThreadPoolExecutor(max_workers=self.workers) as executor:
+                    list(executor.map(lambda url, pages: self.collect(url, sink=pages), urls, ranges))
+
+                log.debug('Merging Account Ranges in Partition Order...')
+                for pages in ranges:
+                    self.accounts.merge(pages)
+
+            else:
+                response = self.request(url)
+
+                batchid = 1
+
+                while "@odata.nextLink" in response:
+                    response = self.request(response["@odata.nextLink"], batch=batchid)
+                    batchid += 1
+
+        finally:
+            self.accounts.close()
 
-        log.debug('Writing Account Data...')
-        with open(self.exportDir, 'w+') as savefile:
-            json.dump(self.accounts, savefile, indent=4)
-        
         return self.accounts
 
+    def _loadStore(self) -> CustomDict:
+        if not os.path.exists(self.storeDir):
+            log.debug('No Account Store Found - Performing Full Sync...')
+            return None
 
+        try:
+            with open(self.storeDir, 'r') as savefile:
+                store = CustomDict(json.load(savefile))
 
+        except Exception as e:
+            log.issue(f'Failed to Read Account Store ({e}) - Performing Full Sync...')
+            return None
 
-    
+        if datetime.now() - datetime.fromisoformat(store.synced) > timedelta(days=self.resyncDays):
+            log.debug(f'Account Store is older than {self.resyncDays} days - Performing Full Sync...')
+            return None
+
+        return store
+
+    def _saveStore(self, store: CustomDict) -> None:
+        os.makedirs(os.path.dirname(self.storeDir), exist_ok=True)
+
+        with open(self.storeDir, 'w+') as savefile:
+            json.dump(store, savefile)
+
+        return
+
+    @staticmethod
+    def _watermark(stamps: list, current: str = '') -> str:
+        return max([stamp or '' for stamp in stamps] + [current or ''])
+
+    def resync(self, *, concurrent: bool = False) -> CustomDict:
+        accounts = self.getAccounts(concurrent=concurrent)
+
+        store = CustomDict({
+            'synced': datetime.now().isoformat(timespec='seconds'),
+            'watermark': self._watermark(accounts.modified),
+            'accounts': {
+                number: {
+                    'new_storestatus': status,
+                    'modifiedon': modified
+                }
+                for number, status, modified in accounts.records()
+                if number is not None
+            }
+        })
+
+        return store
+
+    @Profiler.stage('Dynamics365.syncAccounts')
+    def syncAccounts(self, *, concurrent: bool = False) -> list:
+        log.debug('Synchronizing Account Store...')
+        store = self._loadStore()
+
+        if store is not None and store.watermark:
+            log.debug(f'Requesting Accounts Modified Since {store.watermark}...')
+            self.failed = False
+
+            url = (
+                self.getRequestURL('accounts') 
+                + "?$select=accountnumber,new_storestatus,statuscode,modifiedon"
+                + f"&$filter=modifiedon ge {store.watermark}"
+            )
+            changes = self.collect(url)
+
+            if self.failed:
+                log.issue('Failed to Retrieve Account Changes - Performing Full Sync...')
+                store = None
+
+            else:
+                for record in changes:
+                    if record['accountnumber'] is None:
+                        continue
+
+                    if record.get('statuscode') == 1:
+                        store.accounts[record['accountnumber']] = {
+                            'new_storestatus': record['new_storestatus'],
+                            'modifiedon': record.get('modifiedon')
+                        }
+                    else:
+                        store.accounts.pop(record['accountnumber'], None)
+
+                store.watermark = self._watermark([record.get('modifiedon') for record in changes], store.watermark)
+                log.debug(f'Applied {len(changes)} Account Changes')
+
+        if store is None or not store.watermark:
+            store = self.resync(concurrent=concurrent)
+
+            if self.failed or len(store.accounts) == 0:
+                log.issue('Full Account Sync was Incomplete - Account Store not Updated')
+                return AccountPages()
+
+        self._saveStore(store)
+
+        accounts = AccountPages()
+        accounts.extend(
+            list(store.accounts.keys()),
+            [-1 if record['new_storestatus'] is None else record['new_storestatus'] for record in store.accounts.values()],
+            [record.get('modifiedon') for record in store.accounts.values()]
+        )
+
+        return accounts
@@ -0,0 +1,101 @@
+import os
+import threading
+import importlib.util
+
+import pandas as pd
+
+from concurrent.futures import ThreadPoolExecutor
+
+from .logger import CustomLogger as log
+
+
+def _csv(data: pd.DataFrame, path: str, index: bool) -> None:
+    data.to_csv(path, index=index)
+
+
+def _gzip(data: pd.DataFrame, path: str, index: bool) -> None:
+    data.to_csv(path, index=index, compression='gzip')
+
+
+def _parquet(data: pd.DataFrame, path: str, index: bool) -> None:
+    data.to_parquet(path, index=index, compression='zstd')
+
+
+def _feather(data: pd.DataFrame, path: str, index: bool) -> None:
+    data.reset_index(drop=not index).to_feather(path, compression='zstd')
+
+
+class Exporter():
+    ''' Writes report frames as CSV, gzip-CSV, Parquet or Feather, optionally off the main thread '''
+
+    formats = {
+        'csv': ('.csv', _csv),
+        'csv.gz': ('.csv.gz', _gzip),
+        'parquet': ('.parquet', _parquet),
+        'feather': ('.feather', _feather)
+    }
+
+    arrow = ['parquet', 'feather']
+    retries: int = 5
+
+    def __init__(self, directory: str, fileFormat: str = 'csv'):
+        if fileFormat not in self.formats:
+            log.issue(f'Unknown Export Format [{fileFormat}] - Falling Back to CSV')
+            fileFormat = 'csv'
+
+        if fileFormat in self.arrow and importlib.util.find_spec('pyarrow') is None:
+            log.issue(f'pyarrow is not installed - Exporting [{fileFormat}] as CSV')
+            fileFormat = 'csv'
+
+        self.directory = directory
+        self.extension, self.writer = self.formats[fileFormat]
+
+        self.executor = None
+        self.pending = []
+        self.lock = threading.Lock()
+
+    def getPath(self, name: str, attempt: int = 0) -> str:
+        suffix = f' ({attempt})' if attempt else ''
+
+        return os.path.join(self.directory, f'{name}{suffix}{self.extension}')
+
+    def write(self, data: pd.DataFrame, name: str, *, index: bool = False) -> str:
+        os.makedirs(self.directory, exist_ok=True)
+
+        for attempt in range(self.retries + 1):
+            path = self.getPath(name, attempt)
+
+            try:
+                self.writer(data, path, index)
+                log.debug(f'Exported {data.shape[0]} rows to {path}')
+                return path
+
+            except PermissionError:
+                log.error(f'Failed to Export at destination: {path} - file is currently open')
+
+        log.error(f'Giving Up on Export of [{name}] after {self.retries + 1} attempts')
+
+        return None
+
+    def background(self, data: pd.DataFrame, name: str, *, index: bool = False) -> None:
+        log.debug(f'Exporting [{name}] in the Background...')
+
+        with self.lock:
+            if self.executor is None:
+                self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='Exporter')
+
+            self.pending.append(self.executor.submit(self.write, data, name, index=index))
+
+        return
+
+    def join(self) -> list:
+        with self.lock:
+            pending, self.pending = self.pending, []
+            executor, self.executor = self.executor, None
+
+        paths = [future.result() for future in pending]
+
+        if executor is not None:
+            executor.shutdown()
+
+        return paths
@@ -1,7 +1,13 @@
+import atexit
+import threading
+
+from time import time
+from queue import SimpleQueue
 from colorama import init
 from colorama import Fore
 from colorama import Style
 
+from os import makedirs
 from os.path import abspath
 from datetime import datetime
 
@@ -15,6 +21,7 @@ directory = abspath(__file__).replace('logger.py', 'logfiles/')
 class CustomLogger():
 
     threshold: int = 1
+    fileThreshold: int = 0
 
     levels = [
         'TRACE',
@@ -38,28 +45,104 @@ class CustomLogger():
         key: directory + key for key in ['events', 'errors']
     }
 
+    queue: SimpleQueue = SimpleQueue()
+    writer: threading.Thread = None
+    lock = threading.Lock()
+
+    batch: int = 1000
+    _second: tuple = (None, '')
+
+    @classmethod
+    def _drain(cls) -> None:
+        makedirs(directory, exist_ok=True)
+
+        handles = {
+            key: open(path, 'a+') for key, path in cls.logfiles.items()
+        }
+
+        running = True
+
+        try:
+            while running:
+                items = [cls.queue.get()]
+
+                while len(items) < cls.batch and not cls.queue.empty():
+                    items.append(cls.queue.get_nowait())
+
+                events, errors, markers = [], [], []
+
+                for item in items:
+                    if item is None:
+                        running = False
+                    elif isinstance(item, threading.Event):
+                        markers.append(item)
+                    else:
+                        message, error = item
+                        events.append(message + '\n')
+                        if error:
+                            errors.append(message + '\n')
+
+                handles['events'].writelines(events)
+                handles['errors'].writelines(errors)
+
+                if markers or cls.queue.empty():
+                    for handle in handles.values():
+                        handle.flush()
+
+                for marker in markers:
+                    marker.set()
+        finally:
+            for handle in handles.values():
+                handle.close()
+
+        return
+
+    @classmethod
+    def _start(cls) -> None:
+        with cls.lock:
+            if cls.writer is None or not cls.writer.is_alive():
+                cls.writer = threading.Thread(target=cls._drain, name='CustomLogger', daemon=True)
+                cls.writer.start()
+
+        return
+
+    @classmethod
+    def flush(cls) -> None:
+        if cls.writer is not None and cls.writer.is_alive():
+            marker = threading.Event()
+            cls.queue.put(marker)
+            marker.wait()
+
+        return
+
+    @classmethod
+    def close(cls) -> None:
+        if cls.writer is not None and cls.writer.is_alive():
+            cls.queue.put(None)
+            cls.writer.join()
+
+        return
+
     @classmethod
     def _write(cls, message: str, *, error: bool = False) -> None:
-        with open(cls.logfiles['events'], 'a+') as log:
-            log.write(message +'\n')
-        
-        if error:
-            with open(cls.logfiles['errors'], 'a+') as log:
-                log.write(message + '\n')
+        if cls.writer is None or not cls.writer.is_alive():
+            cls._start()
+
+        cls.queue.put((message, error))
         
         return
     
     @classmethod
-    def _print(cls, message: int, *, level: str) -> None:
-        if cls.levels.index(level) >= cls.threshold:
-            print(message)
-        
-        return
+    def _getTimeStamp(cls) -> str:
+        now = time()
+        second, prefix = cls._second
+
+        if int(now) != second:
+            second = int(now)
+            prefix = datetime.fromtimestamp(second).strftime('%m-%d-%y @ %H:%M:%S')
+            cls._second = (second, prefix)
 
-    @staticmethod
-    def _getTimeStamp() -> str:
-        now = datetime.now()
-        stamp = now.strftime('%m-%d-%y @ %H:%M:%S:%f')[:-3]
+        stamp = f'{prefix}:{int((now - second) * 1000):03d}'
 
         return stamp
 
@@ -73,59 +156,57 @@ class CustomLogger():
         return (file, color)
     
     @classmethod
-    def trace(cls, message: str) -> None:
-        file, color = cls._formatMessage(0, message)
+    def _emit(cls, level: int, message: str, *, error: bool) -> None:
+        toFile = level >= cls.fileThreshold
+        toConsole = level >= cls.threshold
+
+        if not (toFile or toConsole):
+            return
+
+        file, color = cls._formatMessage(level, message)
 
-        cls._write(file, error=False)
-        cls._print(color, level='TRACE')
+        if toFile:
+            cls._write(file, error=error)
+        if toConsole:
+            print(color)
+
+        return
+    
+    @classmethod
+    def trace(cls, message: str) -> None:
+        cls._emit(0, message, error=False)
 
         return
 
     @classmethod
     def debug(cls, message: str) -> None:
-        file, color = cls._formatMessage(1, message)
-
-        cls._write(file, error=False)
-        cls._print(color, level='DEBUG')
+        cls._emit(1, message, error=False)
 
         return
     
     @classmethod
     def state(cls, message: str) -> None:
-        file, color = cls._formatMessage(2, message)
-
-        cls._write(file, error=False)
-        cls._print(color, level='STATE')
+        cls._emit(2, message, error=False)
 
         return
     
     @classmethod
     def issue(cls, message: str) -> None:
-        file, color = cls._formatMessage(3, message)
-
-        cls._write(file, error=True)
-        cls._print(color, level='ISSUE')
+        cls._emit(3, message, error=True)
 
         return
     
     @classmethod
     def error(cls, message: str) -> None:
-        file, color = cls._formatMessage(4, message)
-
-        cls._write(file, error=True)
-        cls._print(color, level='ERROR')
+        cls._emit(4, message, error=True)
 
         return
 
     @classmethod
     def fatal(cls, message: str) -> None:
-        file, color = cls._formatMessage(5, message)
-
-        cls._write(file, error=True)
-        cls._print(color, level='FATAL')
+        cls._emit(5, message, error=True)
 
         return
 
 
-
-    
\ No newline at end of file
+atexit.register(CustomLogger.close)
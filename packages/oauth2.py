@@ -1,16 +1,9 @@
 import os
 import sys
-import requests
-import urllib
-
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from webdriver_manager.chrome import ChromeDriverManager
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
+import urllib.parse
 
 from .types import CustomDict
+from .tokens import TokenCache
 from .logger import CustomLogger as log
 
 
@@ -21,10 +14,12 @@ class OAuth2Flow():
         self.clientSecret = endpoints.secret
         self.authURL = endpoints.authURL
         self.tokenURL = endpoints.tokenURL
-        self.scope = endpoints.requestURL + '/.default'
+        self.scope = endpoints.requestURL + '/.default offline_access'
         self.username = endpoints.username
         self.password = endpoints.password
 
+        self.cache = TokenCache(self.clientSecret)
+
     
     def getSignInURL(self):
         log.debug('Generating OAuth2.0 Sign-In URL...')
@@ -44,6 +39,10 @@ class OAuth2Flow():
     
     @staticmethod
     def createBrowserEngine():
+        from selenium import webdriver
+        from selenium.webdriver.chrome.service import Service
+        from webdriver_manager.chrome import ChromeDriverManager
+
         options = webdriver.ChromeOptions()
         service = Service(ChromeDriverManager().install())
 
@@ -57,6 +56,10 @@ class OAuth2Flow():
 
 
     def login(self, url: str):
+        from selenium.webdriver.common.by import By
+        from selenium.webdriver.support.ui import WebDriverWait
+        from selenium.webdriver.support import expected_conditions as EC
+
         log.state('Simulating OAuth2.0 Authorization Flow...')
         driver = self.createBrowserEngine()
 
@@ -116,11 +119,14 @@ class OAuth2Flow():
         }
 
         if self.clientID:
+            import requests
+
             log.debug('Requesting Access Token...')
             token = requests.post(self.tokenURL, headers=headers, data=data)
 
             try:
                 self.token = token.json()['access_token']
+                self.cache.save(token.json())
                 log.debug('Retrieved Access Token...')
 
             except Exception as e:
@@ -130,9 +136,59 @@ class OAuth2Flow():
         return self.token
     
         
+    def refreshAccessToken(self, refresh: str):
+        log.state('Exchanging Refresh Token for Access Token...')
+
+        data = {
+            'client_id': self.clientID,
+            'scope': self.scope,
+            'client_secret': self.clientSecret,
+            'grant_type': 'refresh_token',
+            'refresh_token': refresh
+        }
+
+        headers = {
+            'Content-Type': 'application/x-www-form-urlencoded'
+        }
+
+        import requests
+
+        try:
+            token = requests.post(self.tokenURL, headers=headers, data=data)
+            response = token.json()
+        except Exception as e:
+            log.issue(f'Failed to Refresh Access Token ({type(e).__name__})')
+            return None
+
+        if not response.get('access_token'):
+            log.issue('Refresh Token Rejected - Falling Back to Sign-In...')
+            self.cache.clear()
+            return None
+
+        if not response.get('refresh_token'):
+            response['refresh_token'] = refresh
+
+        tokens = self.cache.save(response)
+
+        self.token = tokens.access_token
+        return self.token
+
     def authorize(self):
+        cached = self.cache.load()
+
+        if cached is not None and TokenCache.isValid(cached, self.cache.margin):
+            log.debug('Reusing Cached Access Token...')
+            self.token = cached.access_token
+            return self.token
+
+        if cached is not None and cached.refresh_token:
+            access_token = self.refreshAccessToken(cached.refresh_token)
+
+            if access_token is not None:
+                return access_token
+
         url = self.getSignInURL()
         auth_code = self.login(url)
         access_token = self.getAccessToken(auth_code)
 
-        return access_token
\ No newline at end of file
+        return access_token
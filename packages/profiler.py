@@ -0,0 +1,156 @@
+import json
+import time
+import threading
+import functools
+
+from contextlib import contextmanager
+
+from .logger import CustomLogger as log
+
+try:
+    import resource
+    psutil = None
+except ImportError:
+    resource = None
+
+    try:
+        import psutil
+    except ImportError:
+        psutil = None
+
+
+class Profiler():
+    ''' Records wall time, CPU time, peak memory and row counts per pipeline stage '''
+
+    enabled: bool = True
+    records: list = []
+    local = threading.local()
+
+    @staticmethod
+    def _peak() -> int:
+        if resource is not None:
+            return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+        if psutil is not None:
+            info = psutil.Process().memory_info()
+            return getattr(info, 'peak_wset', info.rss)
+
+        return 0
+
+    @classmethod
+    def _rows(cls, value) -> int:
+        if isinstance(value, dict):
+            counts = [cls._rows(item) for item in value.values()]
+            counts = [count for count in counts if count is not None]
+            return sum(counts) if counts else None
+
+        if isinstance(getattr(value, 'shape', None), tuple):
+            return value.shape[0]
+
+        if isinstance(value, (list, tuple)):
+            counts = [cls._rows(item) for item in value]
+            counts = [count for count in counts if count is not None]
+            return sum(counts) if counts else len(value)
+
+        return None
+
+    @classmethod
+    def _inputs(cls, args: tuple, kwargs: dict) -> int:
+        counts = [
+            cls._rows(value) 
+            for value in list(args) + list(kwargs.values())
+            if isinstance(value, dict) or isinstance(getattr(value, 'shape', None), tuple)
+        ]
+        counts = [count for count in counts if count is not None]
+
+        return sum(counts) if counts else None
+
+    @classmethod
+    def stage(cls, name: str):
+        def decorator(func):
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                if not cls.enabled:
+                    return func(*args, **kwargs)
+
+                depth = getattr(cls.local, 'depth', 0)
+                cls.local.depth = depth + 1
+
+                record = {
+                    'stage': name,
+                    'depth': depth,
+                    'thread': threading.current_thread().name,
+                    'rowsIn': cls._inputs(args, kwargs)
+                }
+
+                cls.records.append(record)
+
+                peak = cls._peak()
+                wall, cpu = time.perf_counter(), time.process_time()
+
+                try:
+                    result = func(*args, **kwargs)
+                finally:
+                    record['wall'] = round(time.perf_counter() - wall, 4)
+                    record['cpu'] = round(time.process_time() - cpu, 4)
+                    record['peakDeltaMB'] = round((cls._peak() - peak) / 1024 ** 2, 2)
+
+                    cls.local.depth = depth
+
+                record['rowsOut'] = cls._rows(result)
+
+                return result
+            return wrapper
+        return decorator
+
+    @classmethod
+    def report(cls, path: str) -> None:
+        log.debug(f'Writing Run Report to {path}')
+
+        try:
+            with open(path, 'w+') as savefile:
+                json.dump({'stages': cls.records}, savefile, indent=4)
+        except OSError as e:
+            log.issue(f'Failed to Write Run Report ({e})')
+
+        return
+
+    @classmethod
+    def summary(cls) -> str:
+        header = f"{'Stage':<40} {'Wall (s)':>10} {'CPU (s)':>10} {'Peak +MB':>10} {'Rows In':>12} {'Rows Out':>12}"
+        lines = [header, '-' * len(header)]
+
+        for record in cls.records:
+            if 'wall' not in record:
+                continue
+
+            name = '  ' * record['depth'] + record['stage']
+            rowsIn = '' if record['rowsIn'] is None else f"{record['rowsIn']:,}"
+            rowsOut = '' if record.get('rowsOut') is None else f"{record['rowsOut']:,}"
+
+            lines.append(
+                f"{name:<40} {record['wall']:>10.3f} {record['cpu']:>10.3f} "
+                f"{record['peakDeltaMB']:>10.2f} {rowsIn:>12} {rowsOut:>12}"
+            )
+
+        return '\n'.join(lines)
+
+    @staticmethod
+    @contextmanager
+    def sample(path: str, limit: int = 25):
+        import pstats
+        import cProfile
+
+        log.state(f'Profiling Run with cProfile - Writing Stats to {path}')
+
+        profile = cProfile.Profile()
+        profile.enable()
+
+        try:
+            yield profile
+        finally:
+            profile.disable()
+            profile.dump_stats(path)
+
+            stats = pstats.Stats(profile)
+            stats.sort_stats('cumulative').print_stats(limit)
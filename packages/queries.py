@@ -1,3 +1,6 @@
+movement_columns = ['StoreNumber', 'UPC', 'ReportPeriod', 'Qty']
+
+
 fetch_all = '''
     SELECT *
     FROM dbo.tblWholesalerMovement;
@@ -15,3 +18,85 @@ fetch_sample = '''
     FROM Movement 
     WHERE RowNumber < 10000;
 '''
+
+
+def fetch_window(columns: list = movement_columns, *, ranged: bool = False, wholesaler: bool = False) -> str:
+    ''' Selects only the requested columns for Report Periods on or after a bound cutoff
+
+    When `ranged`, also bounds Report Periods to on or before a second parameter.
+    When `wholesaler`, also limits rows to the WholesalerID bound last
+    '''
+
+    bound = 'ReportPeriod >= ? AND ReportPeriod <= ?' if ranged else 'ReportPeriod >= ?'
+    bound += ' AND WholesalerID = ?' if wholesaler else ''
+
+    return f'''
+    SELECT {', '.join(columns)}
+    FROM dbo.tblWholesalerMovement
+    WHERE {bound};
+'''
+
+
+def fetch_aggregate(periods: int = 0, *, ranged: bool = False, wholesaler: bool = False) -> str:
+    ''' Sums Qty per [StoreNumber.UPC.ReportPeriod] key on the server, mirroring Movement.aggregate
+
+    Filters on a single cutoff by default, on a cutoff and a second upper bound when `ranged`,
+    or on an explicit list of `periods` Report Periods, and on the WholesalerID bound last when `wholesaler`
+    '''
+
+    bound = 'ReportPeriod >= ? AND ReportPeriod <= ?' if ranged else 'ReportPeriod >= ?'
+    bound = f"ReportPeriod IN ({', '.join('?' * periods)})" if periods else bound
+    bound += ' AND WholesalerID = ?' if wholesaler else ''
+
+    return f'''
+    SELECT StoreNumber, UPC, ReportPeriod, COALESCE(SUM(Qty), 0) AS Qty
+    FROM dbo.tblWholesalerMovement
+    WHERE {bound}
+        AND StoreNumber IS NOT NULL
+        AND UPC IS NOT NULL
+    GROUP BY StoreNumber, UPC, ReportPeriod;
+'''
+
+
+def fetch_fingerprint() -> str:
+    ''' Summarizes each Report Period on or after a cutoff by row count and highest ID '''
+
+    return '''
+    SELECT ReportPeriod, COUNT_BIG(*) AS Records, MAX(ID) AS LastID
+    FROM dbo.tblWholesalerMovement
+    WHERE ReportPeriod >= ?
+    GROUP BY ReportPeriod;
+'''
+
+
+def fetch_periods() -> str:
+    ''' Counts rows in each Report Period between a cutoff and an upper bound, used to balance partitions '''
+
+    return '''
+    SELECT ReportPeriod, COUNT(*) AS Records
+    FROM dbo.tblWholesalerMovement
+    WHERE ReportPeriod >= ? AND ReportPeriod <= ?
+    GROUP BY ReportPeriod
+    ORDER BY ReportPeriod;
+'''
+
+
+def fetch_version() -> str:
+    ''' Fingerprints the whole table by row count, highest ID and an aggregate checksum of Qty '''
+
+    return '''
+    SELECT COUNT_BIG(*) AS Records, MAX(ID) AS LastID, CHECKSUM_AGG(CHECKSUM(ReportPeriod, Qty)) AS Checksum
+    FROM dbo.tblWholesalerMovement;
+'''
+
+
+def fetch_wholesalers() -> str:
+    ''' Counts rows per WholesalerID and Report Period on or after a cutoff, condensed by Movement.getWholesalers '''
+
+    return '''
+    SELECT WholesalerID, ReportPeriod, COUNT(*) AS Records
+    FROM dbo.tblWholesalerMovement
+    WHERE ReportPeriod >= ?
+        AND WholesalerID IS NOT NULL
+    GROUP BY WholesalerID, ReportPeriod;
+'''
@@ -0,0 +1,97 @@
+import numpy as np
+import pandas as pd
+
+from .logger import CustomLogger as log
+
+
+''' Rules are Python expressions over the numeric columns of the comparison frame.
+    Percentage columns are exposed with a `Pct` suffix (`Trend%` -> `TrendPct`), and
+    the helpers `missing(x)` (zero or NaN) and `same(x, y)` (within `tolerance`) are
+    available.  Rules are evaluated in order; the first match names the row.  Rules
+    over columns the frame does not have (e.g. the `ControlFlow.scoring` columns
+    `Deviation`, `ZScore` and `SeasonalPct`) are skipped.
+'''
+
+tolerance: float = 0.1
+
+warnings = {
+    'Trend Decline': '(TrendPct < 0.8) & (TrendVar < -5)',
+    'Recent Decline': '(MonthPct < 0.8) & (MonthVar < -5)',
+    'Missing Current Data': 'missing(CurrentMonth) & (Trend > 10)',
+    'Missing Recent Data': 'missing(CurrentMonth) & (LastMonth > 10)',
+    'Statistical Decline': '(ZScore <= -3) & ~(SeasonalPct >= 0.8)'
+}
+
+categories = {
+    'Missing Prolonged Data': '(Trend > 0) & missing(LastMonth) & missing(CurrentMonth)',
+    'Missing Data': 'same(Trend, LastMonth) & missing(CurrentMonth)',
+    'Fast Decline': 'same(Trend, LastMonth) & (LastMonth > CurrentMonth)',
+    'Slow Decline': '(Trend > LastMonth) & (LastMonth > CurrentMonth)',
+    'Fast Growth': 'same(Trend, LastMonth) & (LastMonth < CurrentMonth)',
+    'Slow Growth': '(Trend < LastMonth) & (LastMonth < CurrentMonth)'
+}
+
+
+def missing(x: np.ndarray) -> np.ndarray:
+    return np.isnan(x) | (x == 0)
+
+
+def same(x: np.ndarray, y: np.ndarray) -> np.ndarray:
+    return np.isclose(x, y, rtol=tolerance, atol=0)
+
+
+class RuleEngine():
+    ''' Compiles named rule expressions once and evaluates them as NumPy boolean masks '''
+
+    helpers = {
+        'missing': missing,
+        'same': same
+    }
+
+    def __init__(self, rules: dict):
+        self.rules = [
+            (name, compile(expression, f'<rule: {name}>', 'eval'))
+            for name, expression in rules.items()
+        ]
+
+    @staticmethod
+    def namespace(data: pd.DataFrame) -> dict:
+        columns = {
+            column.replace('%', 'Pct'): data[column].to_numpy(dtype='float64', na_value=np.nan)
+            for column in data.select_dtypes('number').columns
+        }
+
+        return columns
+
+    def evaluate(self, data: pd.DataFrame) -> list:
+        namespace = self.namespace(data)
+        namespace.update(self.helpers)
+
+        masks = []
+
+        for name, code in self.rules:
+            if any(variable not in namespace for variable in code.co_names):
+                log.trace(f'Skipping Rule [{name}] - Missing Columns')
+                continue
+
+            mask = eval(code, {'__builtins__': {}}, namespace)
+            masks.append((name, np.asarray(mask, dtype=bool)))
+
+        return masks
+
+    def label(self, data: pd.DataFrame, default: str = '') -> pd.Categorical:
+        masks = self.evaluate(data)
+
+        names = [default] + [name for name, _ in masks]
+        conditions = [mask for _, mask in masks]
+
+        if conditions:
+            codes = np.select(conditions, np.arange(1, len(names)), default=0)
+        else:
+            codes = np.zeros(data.shape[0], dtype=int)
+
+        return pd.Categorical.from_codes(codes, categories=names)
+
+
+Warnings = RuleEngine(warnings)
+Categories = RuleEngine(categories)
@@ -0,0 +1,132 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from multiprocessing import shared_memory
+from concurrent.futures import ProcessPoolExecutor
+
+from .analytics import Analytics
+from .logger import CustomLogger as log
+
+try:
+    import pyarrow as pa
+except ImportError:
+    pa = None
+
+
+def _write(table, sink) -> None:
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+
+
+def _share(frame: pd.DataFrame) -> tuple:
+    table = pa.Table.from_pandas(frame, preserve_index=False)
+
+    mock = pa.MockOutputStream()
+    _write(table, mock)
+    size = mock.size()
+
+    block = shared_memory.SharedMemory(create=True, size=max(size, 1))
+
+    sink = pa.FixedSizeBufferWriter(pa.py_buffer(block.buf))
+    _write(table, sink)
+    sink.close()
+    del sink
+
+    return block, size
+
+
+def _attach(name: str, size: int) -> tuple:
+    block = shared_memory.SharedMemory(name=name)
+
+    with pa.ipc.open_stream(pa.py_buffer(block.buf)[:size]) as reader:
+        frame = reader.read_all().to_pandas()
+
+    return block, frame
+
+
+def _serialize(frame: pd.DataFrame) -> bytes:
+    table = pa.Table.from_pandas(frame, preserve_index=False)
+
+    sink = pa.BufferOutputStream()
+    _write(table, sink)
+
+    return sink.getvalue().to_pybytes()
+
+
+def _analyze(specs: dict) -> bytes:
+    blocks, frames = [], []
+
+    for key in ['trend', 'previous', 'current']:
+        block, frame = _attach(*specs[key])
+        blocks.append(block)
+        frames.append(frame)
+
+    comparison = Analytics.compare(Analytics.merge(*frames))
+    comparison['_flag'] = Analytics.flags(comparison)
+
+    result = _serialize(comparison)
+
+    del comparison, frames, frame
+    for block in blocks:
+        block.close()
+
+    return result
+
+
+class Shards():
+    ''' Runs the merge, variance and flagging steps per StoreNumber hash partition in worker processes '''
+
+    workers: int = max(1, (os.cpu_count() or 2) - 1)
+
+    @staticmethod
+    def partition(frame: pd.DataFrame, shards: int) -> np.ndarray:
+        hashes = pd.util.hash_pandas_object(frame['StoreNumber'], index=False).to_numpy()
+
+        return hashes % np.uint64(shards)
+
+    @classmethod
+    def analyze(cls, *, trend: pd.DataFrame, previous: pd.DataFrame, current: pd.DataFrame, shards: int) -> tuple:
+        if pa is None:
+            log.issue('pyarrow is not installed - Analyzing without Shards')
+
+            comparison = Analytics.compare(Analytics.merge(trend, previous, current))
+            return comparison, Analytics.annotate(comparison, Analytics.flags(comparison))
+
+        log.debug(f'Partitioning Comparison into {shards} StoreNumber Shards...')
+
+        trend = trend.assign(_order=np.arange(trend.shape[0]))
+        frames = {'trend': trend, 'previous': previous, 'current': current}
+        labels = {key: cls.partition(frame, shards) for key, frame in frames.items()}
+
+        blocks, specs = [], []
+
+        try:
+            for shard in range(shards):
+                spec = {}
+
+                for key, frame in frames.items():
+                    block, size = _share(frame[labels[key] == shard])
+                    blocks.append(block)
+                    spec[key] = (block.name, size)
+
+                specs.append(spec)
+
+            log.debug(f'Analyzing Shards across {min(cls.workers, shards)} Processes...')
+            with ProcessPoolExecutor(max_workers=min(cls.workers, shards)) as executor:
+                results = list(executor.map(_analyze, specs))
+
+        finally:
+            for block in blocks:
+                block.close()
+                block.unlink()
+
+        parts = [pa.ipc.open_stream(result).read_all().to_pandas() for result in results]
+
+        comparison = pd.concat(parts, ignore_index=True)
+        comparison = comparison.sort_values('_order', ignore_index=True).drop(columns='_order')
+
+        flags = comparison.pop('_flag').array
+
+        return comparison, Analytics.annotate(comparison, flags)
@@ -0,0 +1,86 @@
+import os
+import json
+import hashlib
+
+import pandas as pd
+
+from datetime import datetime
+
+from .logger import CustomLogger as log
+
+try:
+    import pyarrow as pa
+except ImportError:
+    pa = None
+
+
+class Snapshot():
+    ''' Arrow IPC copy of a query result, keyed by query hash and table fingerprint, read back memory-mapped '''
+
+    directory = os.path.join(
+        os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'Exports', 'snapshots'
+    )
+
+    def __init__(self, query: str, params: list = None):
+        statement = ' '.join(query.split()) + repr(params)
+        self.key = hashlib.sha256(statement.encode()).hexdigest()[:16]
+
+        self.framePath = os.path.join(self.directory, f'{self.key}.arrow')
+        self.metadataPath = os.path.join(self.directory, f'{self.key}.json')
+
+    def load(self, fingerprint: str = None) -> pd.DataFrame:
+        ''' Maps the snapshot without copying it into RAM, if it matches the fingerprint (any, when None) '''
+        if pa is None or not os.path.exists(self.framePath) or not os.path.exists(self.metadataPath):
+            return None
+
+        try:
+            with open(self.metadataPath, 'r') as savefile:
+                metadata = json.load(savefile)
+
+            if fingerprint is not None and metadata.get('fingerprint') != fingerprint:
+                log.debug(f'Snapshot {self.key} is Stale - Table has Changed Since {metadata.get("created")}')
+                return None
+
+            source = pa.memory_map(self.framePath, 'r')
+            table = pa.ipc.open_file(source).read_all()
+
+        except Exception as e:
+            log.issue(f'Failed to Read Snapshot {self.key} ({e}) - Ignoring...')
+            return None
+
+        log.debug(f'Replaying {table.num_rows} rows from Snapshot {self.key} ({metadata.get("created")})')
+
+        return table.to_pandas(split_blocks=True)
+
+    def save(self, frame: pd.DataFrame, fingerprint: str) -> None:
+        if pa is None:
+            log.issue('pyarrow is not installed - Skipping Snapshot')
+            return
+
+        os.makedirs(self.directory, exist_ok=True)
+
+        metadata = {
+            'created': datetime.now().isoformat(timespec='seconds'),
+            'fingerprint': fingerprint,
+            'rows': int(frame.shape[0])
+        }
+
+        staging = self.framePath + '.tmp'
+
+        try:
+            table = pa.Table.from_pandas(frame, preserve_index=False)
+
+            with pa.OSFile(staging, 'wb') as sink:
+                with pa.ipc.new_file(sink, table.schema) as writer:
+                    writer.write_table(table)
+
+            os.replace(staging, self.framePath)
+
+            with open(self.metadataPath, 'w+') as savefile:
+                json.dump(metadata, savefile, indent=4)
+
+        except Exception as e:
+            log.issue(f'Failed to Write Snapshot {self.key} ({e}) - Continuing without Snapshot')
+            return
+
+        log.debug(f'Saved {metadata["rows"]} rows to Snapshot {self.key}')
@@ -0,0 +1,109 @@
+import os
+import json
+import time
+import base64
+
+from .types import CustomDict
+from .logger import CustomLogger as log
+
+try:
+    from cryptography.fernet import Fernet
+    from cryptography.fernet import InvalidToken
+    from cryptography.hazmat.primitives import hashes
+    from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
+except ImportError:
+    Fernet = None
+
+
+class TokenCache():
+    ''' Encrypted on-disk store of OAuth2.0 tokens, keyed to the application secret through a salted PBKDF2
+
+    The file holds a random salt followed by the Fernet token, and is only readable by its owner
+    '''
+
+    path = os.path.join(
+        os.path.dirname(os.path.dirname(os.path.abspath(__file__))), '.token_cache'
+    )
+    margin: int = 300
+    saltSize: int = 16
+    iterations: int = 600000
+
+    def __init__(self, secret: str):
+        self.secret = None
+        self.ciphers = {}
+
+        if Fernet is None:
+            log.issue('cryptography is not installed - Token Cache Disabled')
+            return
+
+        if not secret:
+            log.issue('No Application Secret to Encrypt Tokens with - Token Cache Disabled')
+            return
+
+        self.secret = secret.encode()
+
+    def getCipher(self, salt: bytes) -> 'Fernet':
+        if salt not in self.ciphers:
+            kdf = PBKDF2HMAC(algorithm=hashes.SHA256(), length=32, salt=salt, iterations=self.iterations)
+            self.ciphers[salt] = Fernet(base64.urlsafe_b64encode(kdf.derive(self.secret)))
+
+        return self.ciphers[salt]
+
+    @staticmethod
+    def isValid(tokens: CustomDict, margin: int = 0) -> bool:
+        return bool(tokens.access_token) and tokens.expires_at - margin > time.time()
+
+    def load(self) -> CustomDict:
+        if self.secret is None or not os.path.exists(self.path):
+            return None
+
+        try:
+            with open(self.path, 'rb') as savefile:
+                content = savefile.read()
+
+            salt, payload = content[:self.saltSize], content[self.saltSize:]
+            payload = self.getCipher(salt).decrypt(payload)
+
+            tokens = CustomDict(json.loads(payload))
+            log.debug('Loaded Cached OAuth2.0 Tokens...')
+
+        except (InvalidToken, ValueError, OSError) as e:
+            log.issue(f'Failed to Read Token Cache ({type(e).__name__}) - Discarding...')
+            self.clear()
+            return None
+
+        return tokens
+
+    def save(self, response: dict) -> CustomDict:
+        tokens = CustomDict({
+            'access_token': response.get('access_token'),
+            'refresh_token': response.get('refresh_token'),
+            'expires_at': time.time() + int(response.get('expires_in', 0))
+        })
+
+        if self.secret is None:
+            return tokens
+
+        salt = os.urandom(self.saltSize)
+        staging = self.path + '.tmp'
+
+        try:
+            payload = self.getCipher(salt).encrypt(json.dumps(tokens).encode())
+
+            descriptor = os.open(staging, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            with os.fdopen(descriptor, 'wb') as savefile:
+                savefile.write(salt + payload)
+
+            os.replace(staging, self.path)
+            log.debug('Cached OAuth2.0 Tokens...')
+
+        except OSError as e:
+            log.issue(f'Failed to Write Token Cache ({e})')
+
+        return tokens
+
+    def clear(self) -> None:
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+        return
@@ -1,3 +1,5 @@
+import threading
+
 
 class CustomDict(dict):
     ''' Allows for Dot Notation Access to Dictionary References '''
@@ -5,3 +7,25 @@ class CustomDict(dict):
     __getattr__ = dict.get
     __setattr__ = dict.__setitem__
     __delattr__ = dict.__delitem__
+
+
+class Deferred():
+    ''' Builds a Class Attribute on First Access, then Replaces Itself with the Result '''
+
+    def __init__(self, factory):
+        self.factory = factory
+        self.lock = threading.Lock()
+
+    def __set_name__(self, owner, name):
+        self.owner = owner
+        self.name = name
+
+    def __get__(self, instance, owner):
+        with self.lock:
+            value = self.owner.__dict__.get(self.name)
+
+            if value is self:
+                value = self.factory()
+                setattr(self.owner, self.name, value)
+
+        return value
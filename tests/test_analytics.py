@@ -0,0 +1,37 @@
+import numpy as np
+import pandas as pd
+
+from packages.analytics import Analytics
+
+
+def scalar(function, x, y) -> float:
+    result = function(x, y)
+
+    return np.nan if result is None else float(result)
+
+
+def test_compare_matches_scalar_functions():
+    values = [np.nan, -3.0, 0.0, 0.5, 1.0, 2.0, 7.25, 12.0, 40.0]
+    rng = np.random.default_rng(0)
+
+    grid = pd.DataFrame(
+        [(trend, month, current) for trend in values for month in values for current in values],
+        columns=['Trend', 'LastMonth', 'CurrentMonth']
+    )
+    noise = pd.DataFrame(
+        rng.integers(-5, 60, size=(500, 3)).astype(float),
+        columns=['Trend', 'LastMonth', 'CurrentMonth']
+    )
+    data = pd.concat([grid, noise], ignore_index=True)
+
+    compared = Analytics.compare(data.copy())
+
+    expected = {
+        'TrendVar': [scalar(Analytics.TrendVar, x, y) for x, y in zip(data['Trend'], data['CurrentMonth'])],
+        'MonthVar': [scalar(Analytics.MonthVar, x, y) for x, y in zip(data['LastMonth'], data['CurrentMonth'])],
+        'Trend%': [scalar(Analytics.TrendDelta, x, y) for x, y in zip(data['Trend'], data['CurrentMonth'])],
+        'Month%': [scalar(Analytics.MonthDelta, x, y) for x, y in zip(data['LastMonth'], data['CurrentMonth'])]
+    }
+
+    for column, values in expected.items():
+        np.testing.assert_array_equal(compared[column].to_numpy(dtype='float64'), np.array(values), err_msg=column)
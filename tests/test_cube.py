@@ -0,0 +1,114 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from packages.cube import Cube
+from packages.data import Movement
+from packages.analytics import Analytics
+
+
+def movement(seed: int = 0) -> pd.DataFrame:
+    random = np.random.default_rng(seed)
+    periods = pd.date_range('2019-01-31', '2024-06-30', freq='ME')
+
+    frame = pd.DataFrame({
+        'StoreNumber': random.integers(0, 40, 20000).astype(str),
+        'UPC': random.integers(0, 25, 20000).astype(str),
+        'ReportPeriod': random.choice(periods, 20000),
+        'Qty': random.integers(-5, 50, 20000).astype(float)
+    })
+
+    return frame
+
+
+def ordered(frame: pd.DataFrame) -> pd.DataFrame:
+    return frame.sort_values(['StoreNumber', 'UPC'], ignore_index=True)[['StoreNumber', 'UPC', 'Qty']]
+
+
+def assertWindows(left, right):
+    for window in ['current', 'previous', 'historical']:
+        pd.testing.assert_frame_equal(ordered(left[window]), ordered(right[window]), check_dtype=False)
+
+
+@pytest.fixture(params=[True, False], ids=['dense', 'sparse'])
+def dense(request, monkeypatch):
+    if not request.param:
+        monkeypatch.setattr(Cube, 'cells', 0)
+
+    return request.param
+
+
+def test_windows_match_labelled_windows(dense):
+    period = pd.Timestamp('2024-04-30')
+    data = movement()
+    data = data[(data['ReportPeriod'] >= Movement.getCutoff(period, 60)) & (data['ReportPeriod'] <= period)]
+
+    previous = [pd.Timestamp('2024-01-31'), pd.Timestamp('2024-02-29'), pd.Timestamp('2024-03-31')]
+    expected = Movement.windows(data, [period], previous)
+
+    cube = Cube(data)
+    assert cube.dense == dense
+    assertWindows(cube.windows(period, window=3, lookback=60), expected)
+
+
+def test_periods_within_one_month_are_kept_apart(dense):
+    data = pd.DataFrame({
+        'StoreNumber': ['1', '1', '1', '1'],
+        'UPC': ['A', 'A', 'A', 'A'],
+        'ReportPeriod': ['2024-01-07', '2024-01-14', '2024-01-21', '2024-01-21'],
+        'Qty': [1.0, 3.0, 2.0, 2.0]
+    })
+
+    package = Cube(data).windows('2024-01-21', window=1, lookback=60)
+
+    assert package.current['Qty'].tolist() == [4.0]
+    assert package.previous['Qty'].tolist() == [3.0]
+    assert package.historical['Qty'].tolist() == [1.0]
+
+
+def test_windows_ignore_periods_after_evaluation(dense):
+    data = movement()
+    period = pd.Timestamp('2023-10-31')
+
+    bounded = data[data['ReportPeriod'] <= period]
+
+    assertWindows(Cube(data).windows(period), Cube(bounded).windows(period))
+
+
+def test_score_matches_groupby(dense):
+    data = movement(1)
+    period = pd.Timestamp('2024-04-30')
+
+    scores = Analytics.score(Cube(data, squares=True), period).set_index(['StoreNumber', 'UPC'])
+
+    totals = data.groupby(['StoreNumber', 'UPC', 'ReportPeriod'])['Qty'].sum()
+    trailing = totals[totals.index.get_level_values(2).to_series().between('2023-04-30', '2024-03-31').to_numpy()]
+    deviation = trailing.groupby(level=[0, 1]).std().round(2)
+
+    current = totals.xs(period, level=2)
+    lastYear = totals.xs(pd.Timestamp('2023-04-30'), level=2)
+    ratio = (current / lastYear[lastYear > 0]).round(2).dropna()
+
+    pd.testing.assert_series_equal(
+        scores['Deviation'].dropna().sort_index(), deviation.dropna().sort_index(), check_names=False
+    )
+    pd.testing.assert_series_equal(
+        scores['Seasonal%'].dropna().sort_index(), ratio.sort_index(), check_names=False
+    )
+
+
+def test_seasonal_ratio_matches_calendar_month_after_leap_year(dense):
+    periods = pd.date_range('2023-06-30', '2025-02-28', freq='ME')
+    data = pd.DataFrame({
+        'StoreNumber': '1',
+        'UPC': 'A',
+        'ReportPeriod': periods,
+        'Qty': np.arange(1, len(periods) + 1, dtype=float)
+    })
+
+    scores = Analytics.score(Cube(data, squares=True), '2025-02-28')
+
+    lastYear = data.loc[data['ReportPeriod'] == '2024-02-29', 'Qty'].item()
+    current = data.loc[data['ReportPeriod'] == '2025-02-28', 'Qty'].item()
+
+    assert scores['Seasonal%'].tolist() == [round(current / lastYear, 2)]
@@ -0,0 +1,221 @@
+import pytest
+
+from benchmarks import stub
+from packages.data import Dynamics
+from packages.types import CustomDict
+from packages.tokens import TokenCache
+from packages.dynamics import Dynamics365
+
+
+@pytest.fixture
+def server(monkeypatch):
+    monkeypatch.setattr(stub.StubHandler, 'pageSize', 100)
+
+    numbers = [f'{(index * 7919) % 999999:06d}' for index in range(1, 1201)]
+    server = stub.serve(stub.buildAccounts(numbers))
+
+    yield server
+
+    server.shutdown()
+
+
+@pytest.fixture
+def connection(server, tmp_path, monkeypatch):
+    monkeypatch.setattr(Dynamics365, 'exportDir', str(tmp_path / 'accounts.ndjson'))
+    monkeypatch.setattr(Dynamics365, 'storeDir', str(tmp_path / 'account_store.json'))
+    monkeypatch.setattr(Dynamics365, 'backoff', 0)
+    monkeypatch.setattr(TokenCache, 'path', str(tmp_path / '.token_cache'))
+
+    endpoint = f'http://127.0.0.1:{server.server_port}'
+    endpoints = CustomDict({
+        'requestURL': endpoint,
+        'tokenURL': endpoint + '/token',
+        'authURL': endpoint + '/authorize',
+        'id': 'test',
+        'secret': 'test',
+        'username': 'test',
+        'password': 'test'
+    })
+
+    connection = Dynamics365(endpoints)
+    connection.token = 'test'
+
+    return connection
+
+
+def expected(server) -> set:
+    return {(record['accountnumber'], record['new_storestatus']) for record in server.accounts}
+
+
+def received(accounts) -> set:
+    return {(number, status) for number, status, _ in accounts.records()}
+
+
+def wrap(connection) -> Dynamics:
+    dynamics = Dynamics.__new__(Dynamics)
+    dynamics.connection = connection
+
+    return dynamics
+
+
+@pytest.mark.parametrize('concurrent', [False, True])
+def test_get_accounts_collects_every_page(server, connection, concurrent):
+    accounts = connection.getAccounts(concurrent=concurrent)
+
+    assert not connection.failed
+    assert len(accounts) == len(server.accounts)
+    assert received(accounts) == expected(server)
+
+
+def test_sequential_and_concurrent_agree(connection):
+    sequential = received(connection.getAccounts(concurrent=False))
+    concurrent = received(connection.getAccounts(concurrent=True))
+
+    assert sequential == concurrent
+
+
+@pytest.mark.parametrize('concurrent', [False, True])
+def test_throttled_page_is_retried(server, connection, concurrent):
+    server.faults[100] = [429, 503, 429]
+
+    accounts = connection.getAccounts(concurrent=concurrent)
+
+    assert server.faults[100] == []
+    assert not connection.failed
+    assert received(accounts) == expected(server)
+
+
+@pytest.mark.parametrize('concurrent', [False, True])
+def test_failed_page_skips_account_filter(server, connection, concurrent):
+    server.faults[100] = [500]
+
+    dynamics = wrap(connection)
+    dynamics.concurrent = concurrent
+
+    active, inactive = dynamics.get_accounts()
+
+    assert connection.failed
+    assert active is None and inactive is None
+
+
+def test_delta_sync_applies_changes(server, connection, monkeypatch):
+    first = connection.syncAccounts()
+    assert received(first) == expected(server)
+
+    changed, removed = server.accounts[0], server.accounts[1]
+    changed.update({'new_storestatus': 100000008, 'modifiedon': '2024-02-01T00:00:00Z'})
+    removed.update({'statuscode': 2, 'modifiedon': '2024-02-01T00:00:00Z'})
+    server.accounts.append({
+        'accountnumber': '999998',
+        'new_storestatus': 100000001,
+        'statuscode': 1,
+        'modifiedon': '2024-02-02T00:00:00Z'
+    })
+
+    resyncs = []
+    monkeypatch.setattr(connection, 'resync', lambda **kwargs: resyncs.append(kwargs))
+
+    second = connection.syncAccounts()
+    active = {record['accountnumber'] for record in server.accounts if record['statuscode'] == 1}
+
+    assert resyncs == []
+    assert not connection.failed
+    assert {number for number, _, _ in second.records()} == active
+    assert (changed['accountnumber'], 100000008) in received(second)
+    assert connection._loadStore().watermark == '2024-02-02T00:00:00Z'
+
+
+def test_failed_delta_falls_back_to_full_resync(server, connection):
+    connection.syncAccounts()
+    server.accounts.pop()
+
+    server.faults[0] = [500]
+    accounts = connection.syncAccounts()
+
+    assert server.faults[0] == []
+    assert not connection.failed
+    assert received(accounts) == expected(server)
+
+
+def test_stale_store_falls_back_to_full_resync(server, connection, monkeypatch):
+    connection.syncAccounts()
+    monkeypatch.setattr(Dynamics365, 'resyncDays', -1)
+
+    calls = []
+    resync = connection.resync
+    monkeypatch.setattr(connection, 'resync', lambda **kwargs: calls.append(kwargs) or resync(**kwargs))
+
+    accounts = connection.syncAccounts()
+
+    assert len(calls) == 1
+    assert received(accounts) == expected(server)
+
+
+def test_incomplete_resync_skips_account_filter(server, connection):
+    server.faults[100] = [500]
+
+    dynamics = wrap(connection)
+    dynamics.delta = True
+
+    active, inactive = dynamics.get_accounts()
+
+    assert active is None and inactive is None
+    assert connection._loadStore() is None
+
+
+def test_audit_file_is_written_under_exports(server, connection, tmp_path, monkeypatch):
+    audit = tmp_path / 'Exports' / 'accounts.ndjson'
+    monkeypatch.setattr(Dynamics365, 'exportDir', str(audit))
+
+    accounts = connection.getAccounts()
+    accounts.close()
+
+    assert audit.read_text().count('\n') == len(server.accounts)
+
+
+def test_exhausted_retries_do_not_sleep_again(server, connection, monkeypatch):
+    server.faults[100] = [429] * (connection.retries + 1)
+
+    delays = []
+    monkeypatch.setattr('packages.dynamics.time.sleep', delays.append)
+
+    connection.getAccounts()
+
+    assert connection.failed
+    assert len(delays) == connection.retries
+
+
+@pytest.mark.parametrize('header, delay', [
+    ('2', 2.0),
+    ('Wed, 21 Oct 2015 07:28:00 GMT', 0.0),
+    ('soon', 4.0),
+    (None, 4.0)
+])
+def test_retry_after_is_parsed_defensively(header, delay):
+    response = CustomDict({'headers': {} if header is None else {'Retry-After': header}})
+
+    assert Dynamics365.getDelay(response, 4.0) == delay
+
+
+@pytest.mark.parametrize('concurrent', [False, True])
+def test_stalled_page_fails_instead_of_hanging(server, connection, monkeypatch, concurrent):
+    monkeypatch.setattr(Dynamics365, 'timeout', 0.2)
+    server.faults[100] = [None]
+
+    connection.getAccounts(concurrent=concurrent)
+
+    assert connection.failed
+
+
+def test_concurrent_ranges_merge_in_partition_order(server, connection, tmp_path, monkeypatch):
+    monkeypatch.setattr(Dynamics365, 'exportDir', str(tmp_path / 'sequential.ndjson'))
+    sequential = connection.getAccounts(concurrent=False).numbers
+
+    audits = []
+    for run in range(3):
+        monkeypatch.setattr(Dynamics365, 'exportDir', str(tmp_path / f'concurrent-{run}.ndjson'))
+
+        assert connection.getAccounts(concurrent=True).numbers == sequential
+        audits.append((tmp_path / f'concurrent-{run}.ndjson').read_text())
+
+    assert audits == [(tmp_path / 'sequential.ndjson').read_text()] * 3
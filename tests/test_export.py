@@ -0,0 +1,18 @@
+import importlib.util
+
+import pandas as pd
+import pytest
+
+from packages.export import Exporter
+
+
+@pytest.mark.parametrize('fileFormat', ['parquet', 'feather'])
+def test_arrow_formats_fall_back_to_csv_without_pyarrow(tmp_path, monkeypatch, fileFormat):
+    findSpec = importlib.util.find_spec
+    monkeypatch.setattr(importlib.util, 'find_spec', lambda name, *args: None if name == 'pyarrow' else findSpec(name, *args))
+
+    exporter = Exporter(str(tmp_path), fileFormat)
+    path = exporter.write(pd.DataFrame({'StoreNumber': ['1'], 'Qty': [2.0]}), 'report')
+
+    assert exporter.extension == '.csv'
+    assert path.endswith('report.csv')
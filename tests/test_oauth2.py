@@ -0,0 +1,127 @@
+import os
+import stat
+import time
+
+import pytest
+
+from benchmarks import stub
+from packages.oauth2 import OAuth2Flow
+from packages.types import CustomDict
+from packages.tokens import TokenCache
+
+
+@pytest.fixture
+def server():
+    server = stub.serve(stub.buildAccounts([]))
+
+    yield server
+
+    server.shutdown()
+
+
+@pytest.fixture
+def flow(server, tmp_path, monkeypatch):
+    monkeypatch.setattr(TokenCache, 'path', str(tmp_path / '.token_cache'))
+    monkeypatch.setattr(TokenCache, 'iterations', 1000)
+
+    endpoint = f'http://127.0.0.1:{server.server_port}'
+    endpoints = CustomDict({
+        'requestURL': endpoint,
+        'tokenURL': endpoint + '/token',
+        'authURL': endpoint + '/authorize',
+        'id': 'test',
+        'secret': 'test',
+        'username': 'test',
+        'password': 'test'
+    })
+
+    flow = OAuth2Flow(endpoints)
+
+    def login(url):
+        flow.signIns.append(url)
+        return 'authcode'
+
+    flow.signIns = []
+    monkeypatch.setattr(flow, 'login', login)
+
+    return flow
+
+
+def test_authorize_reuses_cached_token(server, flow):
+    flow.cache.save({'access_token': 'cached', 'refresh_token': 'refresh', 'expires_in': 3600})
+
+    assert flow.authorize() == 'cached'
+    assert server.grants == []
+    assert flow.signIns == []
+
+
+def test_authorize_refreshes_expired_token(server, flow):
+    flow.cache.save({'access_token': 'expired', 'refresh_token': 'refresh', 'expires_in': 0})
+
+    assert flow.authorize() == 'benchmark'
+    assert server.grants == ['refresh_token']
+    assert flow.signIns == []
+    assert flow.cache.load().refresh_token == 'benchmark'
+
+
+def test_refresh_keeps_refresh_token_when_none_is_returned(server, flow):
+    flow.cache.save({'access_token': 'expired', 'refresh_token': 'refresh', 'expires_in': 0})
+    server.token = (200, {'access_token': 'renewed', 'expires_in': 3600})
+
+    assert flow.authorize() == 'renewed'
+
+    cached = flow.cache.load()
+    assert cached.refresh_token == 'refresh'
+    assert cached.expires_at > time.time()
+
+
+def test_authorize_falls_back_to_browser(server, flow):
+    assert flow.authorize() == 'benchmark'
+    assert server.grants == ['authorization_code']
+    assert len(flow.signIns) == 1
+    assert flow.cache.load().access_token == 'benchmark'
+
+
+def test_rejected_refresh_falls_back_to_browser(server, flow, monkeypatch):
+    flow.cache.save({'access_token': 'expired', 'refresh_token': 'revoked', 'expires_in': 0})
+    server.token = (400, {'error': 'invalid_grant'})
+
+    assert flow.refreshAccessToken('revoked') is None
+    assert flow.cache.load() is None
+
+    flow.cache.save({'access_token': 'expired', 'refresh_token': 'revoked', 'expires_in': 0})
+    monkeypatch.setattr(flow, 'getAccessToken', lambda authcode: 'signed-in')
+
+    assert flow.authorize() == 'signed-in'
+    assert server.grants == ['refresh_token', 'refresh_token']
+    assert len(flow.signIns) == 1
+
+
+def test_missing_secret_disables_cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(TokenCache, 'path', str(tmp_path / '.token_cache'))
+
+    cache = TokenCache(None)
+    cache.save({'access_token': 'token', 'refresh_token': 'refresh', 'expires_in': 3600})
+
+    assert cache.secret is None
+    assert cache.load() is None
+    assert not (tmp_path / '.token_cache').exists()
+
+
+def test_cache_is_private_and_salted(tmp_path, monkeypatch):
+    monkeypatch.setattr(TokenCache, 'path', str(tmp_path / '.token_cache'))
+    monkeypatch.setattr(TokenCache, 'iterations', 1000)
+
+    cache = TokenCache('test')
+    cache.save({'access_token': 'token', 'refresh_token': 'refresh', 'expires_in': 3600})
+    first = (tmp_path / '.token_cache').read_bytes()
+
+    cache.save({'access_token': 'token', 'refresh_token': 'refresh', 'expires_in': 3600})
+    second = (tmp_path / '.token_cache').read_bytes()
+
+    assert first[:TokenCache.saltSize] != second[:TokenCache.saltSize]
+    if os.name == 'posix':
+        assert stat.S_IMODE(os.stat(TokenCache.path).st_mode) == 0o600
+
+    assert TokenCache('test').load().refresh_token == 'refresh'
+    assert TokenCache('other').load() is None